@@ -26,6 +26,69 @@ from .prollytree import (
     ConflictResolution
 )
 
+
+class DiffArrays:
+    """Columnar view over the packed buffers returned by ``VersionedKvStore.diff_arrays``.
+
+    The buffers are kept as-is; keys and values are only sliced out when a
+    column is requested, so large diffs stay cheap until they are consumed.
+    """
+
+    ADDED = 0
+    REMOVED = 1
+    MODIFIED = 2
+
+    _OPERATION_NAMES = ("Added", "Removed", "Modified")
+
+    def __init__(self, buffers):
+        (key_offsets, self.keys_blob, self.op_codes,
+         old_offsets, self.old_values_blob,
+         new_offsets, self.new_values_blob) = buffers
+        self.key_offsets = memoryview(key_offsets).cast("Q")
+        self.old_offsets = memoryview(old_offsets).cast("Q")
+        self.new_offsets = memoryview(new_offsets).cast("Q")
+
+    @classmethod
+    def from_store(cls, store, from_ref, to_ref):
+        """Compute the diff between two references of ``store``."""
+        return cls(store.diff_arrays(from_ref, to_ref))
+
+    def __len__(self):
+        return len(self.op_codes)
+
+    @staticmethod
+    def _slice(blob, offsets):
+        return [blob[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    def keys(self):
+        """Changed keys as a list of bytes."""
+        return self._slice(self.keys_blob, self.key_offsets)
+
+    def operation_types(self):
+        """Operation names ('Added', 'Removed', 'Modified'), one per key."""
+        return [self._OPERATION_NAMES[code] for code in self.op_codes]
+
+    def old_values(self):
+        """Previous values; None for added keys."""
+        values = self._slice(self.old_values_blob, self.old_offsets)
+        return [None if code == self.ADDED else value
+                for code, value in zip(self.op_codes, values)]
+
+    def new_values(self):
+        """Current values; None for removed keys."""
+        values = self._slice(self.new_values_blob, self.new_offsets)
+        return [None if code == self.REMOVED else value
+                for code, value in zip(self.op_codes, values)]
+
+    def to_dict(self):
+        """Column dictionary, suitable for e.g. ``pandas.DataFrame(diff.to_dict())``."""
+        return {
+            "key": self.keys(),
+            "operation_type": self.operation_types(),
+            "old_value": self.old_values(),
+            "new_value": self.new_values(),
+        }
+
 # Try to import SQL functionality if available
 sql_available = False
 try:
@@ -73,7 +136,8 @@ __all__ = [
     "VersionedKvStore",
     "StorageBackend",
     "MergeConflict",
-    "ConflictResolution"
+    "ConflictResolution",
+    "DiffArrays"
 ]
 
 if sql_available:
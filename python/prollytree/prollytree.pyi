@@ -190,6 +190,13 @@ class KvDiff:
         """The operation that occurred on this key"""
         ...
 
+class StatusIter:
+    """Iterator over (key, status) staging area entries"""
+
+    def __iter__(self) -> "StatusIter": ...
+    def __next__(self) -> Tuple[bytes, str]: ...
+    def __len__(self) -> int: ...
+
 class VersionedKvStore:
     """A versioned key-value store backed by Git and ProllyTree.
 
@@ -250,6 +257,15 @@ class VersionedKvStore:
         """
         ...
 
+    def insert_many(self, pairs: List[Tuple[bytes, bytes]]) -> None:
+        """
+        Insert several key-value pairs (stages the changes) in one call.
+
+        Args:
+            pairs: List of (key, value) tuples as bytes
+        """
+        ...
+
     def get(self, key: bytes) -> Optional[bytes]:
         """
         Get a value by key.
@@ -262,6 +278,18 @@ class VersionedKvStore:
         """
         ...
 
+    def get_many(self, keys: List[bytes]) -> List[Optional[bytes]]:
+        """
+        Get the values of several keys in one call.
+
+        Args:
+            keys: The keys to look up
+
+        Returns:
+            One value per key, in order, with None for keys that are not found
+        """
+        ...
+
     def update(self, key: bytes, value: bytes) -> bool:
         """
         Update an existing key-value pair (stages the change).
@@ -296,6 +324,15 @@ class VersionedKvStore:
         """
         ...
 
+    def list_keys_utf8(self) -> List[str]:
+        """
+        List all keys in the store as strings (includes staged changes).
+
+        Raises:
+            ValueError: If a key is not valid UTF-8
+        """
+        ...
+
     def status(self) -> List[Tuple[bytes, str]]:
         """
         Show current staging area status.
@@ -305,6 +342,24 @@ class VersionedKvStore:
         """
         ...
 
+    def status_iter(self) -> StatusIter:
+        """
+        Iterate over the staging area status without building a list.
+
+        Returns:
+            Iterator of (key, status) tuples where status is "added", "modified", or "deleted"
+        """
+        ...
+
+    def status_utf8(self) -> List[Tuple[str, str]]:
+        """
+        Show current staging area status with keys decoded as strings.
+
+        Raises:
+            ValueError: If a key is not valid UTF-8
+        """
+        ...
+
     def commit(self, message: str) -> str:
         """
         Commit staged changes.
@@ -387,6 +442,20 @@ class VersionedKvStore:
         ...
 
 
+    def get_commit_ids_for_key(self, key: bytes) -> List[str]:
+        """
+        Get the ids of all commits that contain changes to a specific key.
+
+        Like get_commits_for_key, but skips building the per-commit metadata.
+
+        Args:
+            key: The key to search for
+
+        Returns:
+            List of commit ids, newest first
+        """
+        ...
+
     def get_commit_history(self) -> List[Dict[str, Union[str, int]]]:
         """
         Get the commit history for the repository.
@@ -531,6 +600,32 @@ class VersionedKvStore:
         """
         ...
 
+    def diff_arrays(
+        self, from_ref: str, to_ref: str
+    ) -> Tuple[bytes, bytes, bytes, bytes, bytes, bytes, bytes]:
+        """
+        Compare two references and return the differences as packed columns.
+
+        Crosses the FFI boundary a fixed number of times regardless of diff size;
+        wrap the result in ``prollytree.DiffArrays`` for a column view.
+
+        Args:
+            from_ref: Reference (branch or commit) to compare from
+            to_ref: Reference (branch or commit) to compare to
+
+        Returns:
+            Tuple of (key_offsets, keys, op_codes, old_offsets, old_values,
+            new_offsets, new_values). Offsets are native-endian uint64 arrays with
+            one more entry than there are diffs; op_codes holds one byte per diff
+            (0 = Added, 1 = Removed, 2 = Modified).
+
+        Example:
+            diff = prollytree.DiffArrays(store.diff_arrays("main", "feature"))
+            for key, op in zip(diff.keys(), diff.operation_types()):
+                print(key, op)
+        """
+        ...
+
     def current_commit(self) -> str:
         """
         Get the current commit's object ID.
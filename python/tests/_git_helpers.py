@@ -0,0 +1,66 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Git subprocess helpers for the whole test suite
+
+Every scratch repository in the suite comes from init_repo_fast, through the
+conftest templates, and all git output goes to DEVNULL via QUIET.
+"""
+
+import os
+import subprocess
+
+# git output is never inspected, so let the kernel discard it instead of piping
+QUIET = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+
+
+def init_repo_fast(path, user="Test User", email="test@example.com", files=None,
+                   message="Initial commit"):
+    """Create a git repository on ``main`` at ``path`` using a single git invocation
+
+    The identity is appended to ``.git/config`` directly rather than through
+    ``git config``. When ``files`` (name -> text) is given, they are written
+    to the working tree and committed by streaming them through
+    ``git fast-import`` in the same shell call as ``git init``, which skips
+    the index entirely.
+
+    The repository is deliberately not bare: WorktreeManager requires
+    ``<path>/.git`` and VersionedKvStore looks for it above its dataset
+    directory. Nothing is checked out either way, since fast-import only
+    writes objects and the ref.
+    """
+    os.makedirs(path, exist_ok=True)
+
+    # Scratch repositories don't need their objects flushed to stable storage
+    command = "git -c core.fsync=none init -q -b main"
+    stream = None
+    if files:
+        chunks = []
+        for mark, (name, content) in enumerate(files.items(), start=1):
+            data = content.encode()
+            with open(os.path.join(path, name), "wb") as f:
+                f.write(data)
+            chunks.append(b"blob\nmark :%d\ndata %d\n%s\n" % (mark, len(data), data))
+
+        msg = message.encode()
+        chunks.append(b"commit refs/heads/main\ncommitter %s <%s> now\ndata %d\n%s\n"
+                      % (user.encode(), email.encode(), len(msg), msg))
+        chunks.extend(b"M 100644 :%d %s\n" % (mark, name.encode())
+                      for mark, name in enumerate(files, start=1))
+        stream = b"".join(chunks)
+        command += " && git -c core.fsync=none fast-import --quiet --date-format=now"
+
+    subprocess.run(command, cwd=path, input=stream, shell=True, check=True, **QUIET)
+
+    with open(os.path.join(path, ".git", "config"), "a") as f:
+        f.write(f"[user]\n\tname = {user}\n\temail = {email}\n")
@@ -0,0 +1,39 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Step-by-step narration for the worktree tests, printed only when PT_TEST_VERBOSE is set
+"""
+
+import io
+import os
+import sys
+
+VERBOSE = bool(os.environ.get("PT_TEST_VERBOSE"))
+
+_buffer = io.StringIO()
+
+
+def log(*args, **kwargs):
+    """Queue a line of narration; nothing reaches stdout until flush()"""
+    if VERBOSE:
+        print(*args, file=_buffer, **kwargs)
+
+
+def flush():
+    """Write everything queued since the last flush with a single stdout write"""
+    text = _buffer.getvalue()
+    if text:
+        _buffer.seek(0)
+        _buffer.truncate()
+        sys.stdout.write(text)
+        sys.stdout.flush()
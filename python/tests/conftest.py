@@ -0,0 +1,103 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Shared pytest configuration for the ProllyTree Python tests
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import _narration
+from _git_helpers import init_repo_fast
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_prollytree():
+    """Load the native extension once up front so the first test isn't billed for it
+
+    A missing extension is left for each module to handle, so the ones that
+    importorskip it are still skipped rather than errored.
+    """
+    try:
+        import prollytree  # noqa: F401
+    except ImportError:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _flush_narration():
+    """Emit a test's buffered PT_TEST_VERBOSE narration in one write once it finishes"""
+    yield
+    _narration.flush()
+
+
+# /dev/shm is only used for scratch data when at least this much of it is free
+_TMPFS_MIN_FREE = 256 * 1024 * 1024
+
+
+def _tmpfs_dir():
+    """``/dev/shm`` when it exists and has room for the suite's scratch data, else None"""
+    if os.environ.get("PT_TEST_NO_TMPFS") or not os.path.isdir("/dev/shm"):
+        return None
+    try:
+        if shutil.disk_usage("/dev/shm").free < _TMPFS_MIN_FREE:
+            return None
+    except OSError:
+        return None
+    return "/dev/shm"
+
+
+@pytest.fixture(scope="session")
+def scratch_root(tmp_path_factory):
+    """Root for every scratch repository, store and worktree of the session
+
+    The data is throwaway, so it goes to /dev/shm where available, sparing
+    the suite's many small git and store writes the disk IO and fsyncs. When
+    /dev/shm is missing or short of space (it is 64 MB under Docker by
+    default), or PT_TEST_NO_TMPFS is set, pytest's basetemp is used instead.
+    """
+    tmpfs = _tmpfs_dir()
+    if tmpfs is None:
+        yield tmp_path_factory.mktemp("scratch")
+        return
+    path = Path(tempfile.mkdtemp(prefix="prolly-tests-", dir=tmpfs))
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def scratch_path(scratch_root, request):
+    """Fresh directory under ``scratch_root`` for the requesting test"""
+    prefix = re.sub(r"\W", "_", request.node.name)[:40] + "-"
+    return Path(tempfile.mkdtemp(prefix=prefix, dir=scratch_root))
+
+
+@pytest.fixture(scope="session")
+def _git_template(scratch_root):
+    """Repository on ``main`` with one committed README, built once per session"""
+    path = scratch_root / "templates" / "main_repo"
+    init_repo_fast(str(path), files={"README.md": "# Test Repository\n"})
+    return path
+
+
+@pytest.fixture
+def main_repo(_git_template, scratch_path):
+    """Private copy of the template repository for tests that mutate it"""
+    dst = scratch_path / "main_repo"
+    shutil.copytree(_git_template, dst)
+    return str(dst)
@@ -13,41 +13,24 @@
 
 """Tests for the diff and current_commit functionality in VersionedKvStore."""
 
-import tempfile
-import shutil
-import subprocess
-import os
 import pytest
 from pathlib import Path
 
 import prollytree
 
+# Keys and values shared across tests
+_K1, _V1, _K2, _V2, _K3, _V3 = b"key1", b"value1", b"key2", b"value2", b"key3", b"value3"
+
 
 class TestDiffFunctionality:
     """Test diff and current_commit functions."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-
-        # Initialize git repository in the temp directory
-        subprocess.run(["git", "init"], cwd=self.temp_dir, check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], cwd=self.temp_dir, check=True)
-        subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=self.temp_dir, check=True)
-
+    @pytest.fixture(autouse=True)
+    def _store_path(self, main_repo):
+        """Point each test at a data/ directory in a private copy of the git template."""
         # Create subdirectory for the store (not in git root)
-        self.store_path = Path(self.temp_dir) / "data"
-        self.store_path.mkdir(parents=True, exist_ok=True)
-
-        # Change working directory to the store path for git operations
-        self.original_cwd = os.getcwd()
-        os.chdir(str(self.store_path))
-
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        # Restore original working directory
-        os.chdir(self.original_cwd)
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        self.store_path = Path(main_repo) / "data"
+        self.store_path.mkdir()
 
     def test_diff_between_commits(self):
         """Test diff between two commits."""
@@ -55,14 +38,14 @@ class TestDiffFunctionality:
         store = prollytree.VersionedKvStore(str(self.store_path))
 
         # Create first commit
-        store.insert(b"key1", b"value1")
-        store.insert(b"key2", b"value2")
+        store.insert(_K1, _V1)
+        store.insert(_K2, _V2)
         commit1 = store.commit("Initial commit")
 
         # Create second commit with changes
-        store.insert(b"key3", b"value3")  # Added
-        store.update(b"key1", b"value1_modified")  # Modified
-        store.delete(b"key2")  # Removed
+        store.insert(_K3, _V3)  # Added
+        store.update(_K1, b"value1_modified")  # Modified
+        store.delete(_K2)  # Removed
         commit2 = store.commit("Second commit")
 
         # Get diff between commits
@@ -73,23 +56,23 @@ class TestDiffFunctionality:
 
         # Check that we have all expected changes
         assert len(diffs) == 3
-        assert b"key1" in diff_map
-        assert b"key2" in diff_map
-        assert b"key3" in diff_map
+        assert _K1 in diff_map
+        assert _K2 in diff_map
+        assert _K3 in diff_map
 
         # Verify operation types
-        key1_op = diff_map[b"key1"]
+        key1_op = diff_map[_K1]
         assert key1_op.operation_type == "Modified"
-        assert key1_op.old_value == b"value1"
+        assert key1_op.old_value == _V1
         assert key1_op.new_value == b"value1_modified"
 
-        key2_op = diff_map[b"key2"]
+        key2_op = diff_map[_K2]
         assert key2_op.operation_type == "Removed"
-        assert key2_op.value == b"value2"
+        assert key2_op.value == _V2
 
-        key3_op = diff_map[b"key3"]
+        key3_op = diff_map[_K3]
         assert key3_op.operation_type == "Added"
-        assert key3_op.value == b"value3"
+        assert key3_op.value == _V3
 
     def test_diff_between_branches(self):
         """Test diff between two branches."""
@@ -132,13 +115,43 @@ class TestDiffFunctionality:
         feature_only_op = diff_map[b"feature_only"]
         assert feature_only_op.operation_type == "Added"
 
+    def test_diff_arrays(self):
+        """Test the packed column form of diff."""
+        store = prollytree.VersionedKvStore(str(self.store_path))
+
+        store.insert(_K1, _V1)
+        store.insert(_K2, _V2)
+        commit1 = store.commit("Initial commit")
+
+        store.insert(_K3, _V3)
+        store.update(_K1, b"value1_modified")
+        store.delete(_K2)
+        commit2 = store.commit("Second commit")
+
+        diff = prollytree.DiffArrays.from_store(store, commit1, commit2)
+        assert len(diff) == 3
+
+        rows = {
+            key: (op, old, new)
+            for key, op, old, new in zip(
+                diff.keys(), diff.operation_types(), diff.old_values(), diff.new_values()
+            )
+        }
+        assert rows[_K1] == ("Modified", _V1, b"value1_modified")
+        assert rows[_K2] == ("Removed", _V2, None)
+        assert rows[_K3] == ("Added", None, _V3)
+
+        # Same content as the object-per-entry API
+        assert sorted(diff.keys()) == sorted(d.key for d in store.diff(commit1, commit2))
+        assert len(prollytree.DiffArrays.from_store(store, commit1, commit1)) == 0
+
     def test_current_commit(self):
         """Test getting current commit ID."""
         # Initialize store
         store = prollytree.VersionedKvStore(str(self.store_path))
 
         # Create first commit
-        store.insert(b"key1", b"value1")
+        store.insert(_K1, _V1)
         commit1 = store.commit("First commit")
 
         # Get current commit
@@ -146,7 +159,7 @@ class TestDiffFunctionality:
         assert current == commit1
 
         # Create second commit
-        store.insert(b"key2", b"value2")
+        store.insert(_K2, _V2)
         commit2 = store.commit("Second commit")
 
         # Current commit should be updated
@@ -155,7 +168,7 @@ class TestDiffFunctionality:
 
         # Test with branch operations
         store.create_branch("test-branch")
-        store.insert(b"key3", b"value3")
+        store.insert(_K3, _V3)
         commit3 = store.commit("Third commit on branch")
 
         # Current commit should be updated
@@ -173,7 +186,7 @@ class TestDiffFunctionality:
         store = prollytree.VersionedKvStore(str(self.store_path))
 
         # Create a commit
-        store.insert(b"key1", b"value1")
+        store.insert(_K1, _V1)
         commit1 = store.commit("First commit")
 
         # Get diff between same commit
@@ -188,10 +201,10 @@ class TestDiffFunctionality:
         store = prollytree.VersionedKvStore(str(self.store_path))
 
         # Create commits with changes
-        store.insert(b"key1", b"value1")
+        store.insert(_K1, _V1)
         commit1 = store.commit("First")
 
-        store.update(b"key1", b"value2")
+        store.update(_K1, _V2)
         commit2 = store.commit("Second")
 
         # Get diff
@@ -217,11 +230,11 @@ class TestDiffFunctionality:
         store = prollytree.VersionedKvStore(str(self.store_path))
 
         # Create commits with changes to a specific key
-        store.insert(b"tracked_key", b"value1")
+        store.insert(b"tracked_key", _V1)
         store.insert(b"other_key", b"other_value")
         commit1 = store.commit("First commit")
 
-        store.update(b"tracked_key", b"value2")
+        store.update(b"tracked_key", _V2)
         commit2 = store.commit("Second commit - tracked_key changed")
 
         store.insert(b"another_key", b"another_value")
@@ -234,10 +247,12 @@ class TestDiffFunctionality:
         assert len(commits_for_key) == 2
 
         # Verify the commit IDs match what we expect
-        commit_ids = [commit['id'] for commit in commits_for_key]
+        commit_id_list = store.get_commit_ids_for_key(b"tracked_key")
+        assert commit_id_list == [commit['id'] for commit in commits_for_key]
+        commit_ids = set(commit_id_list)
         assert commit2 in commit_ids  # Most recent change
         assert commit1 in commit_ids  # First commit with this key
-        assert commit3 not in [c['id'] for c in commits_for_key]  # Third commit didn't touch tracked_key
+        assert commit3 not in commit_ids  # Third commit didn't touch tracked_key
 
         # Verify commits are in reverse chronological order (newest first)
         assert commits_for_key[0]['id'] == commit2  # Most recent first
@@ -14,181 +14,160 @@
 Test merge functionality in VersionedKvStore
 """
 
-import tempfile
-import subprocess
 import os
-from prollytree import VersionedKvStore, ConflictResolution, MergeConflict
+import pytest
 
+from prollytree import VersionedKvStore, ConflictResolution, MergeConflict
 
-def setup_git_repo(tmpdir):
-    """Setup git repository for testing"""
-    # Initialize git in the root directory
-    subprocess.run(['git', 'init'], cwd=tmpdir, check=True, capture_output=True)
-    subprocess.run(['git', 'config', 'user.name', 'Test'], cwd=tmpdir, check=True, capture_output=True)
-    subprocess.run(['git', 'config', 'user.email', 'test@test.com'], cwd=tmpdir, check=True, capture_output=True)
+# Keys and values shared across tests
+_CONFLICT_KEY, _SHARED = b"conflict_key", b"shared"
+_INITIAL_VALUE, _FEATURE_VALUE, _MAIN_VALUE = b"initial_value", b"feature_value", b"main_value"
 
-    # Create a subdirectory for the data store
-    data_dir = os.path.join(tmpdir, 'data')
-    os.makedirs(data_dir, exist_ok=True)
 
-    return data_dir
+@pytest.fixture
+def data_dir(main_repo):
+    """Data directory inside a private copy of the shared git template"""
+    path = os.path.join(main_repo, 'data')
+    os.makedirs(path)
+    return path
 
 
-def test_merge_no_conflicts():
+def test_merge_no_conflicts(data_dir):
     """Test merging branches with no conflicts"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        data_dir = setup_git_repo(tmpdir)
+    # Initialize store
+    store = VersionedKvStore(data_dir)
 
-        # Initialize store
-        store = VersionedKvStore(data_dir)
+    # Add initial data
+    store.insert(_SHARED, _INITIAL_VALUE)
+    store.insert(b"key1", b"value1")
+    store.commit("Initial commit")
 
-        # Add initial data
-        store.insert(b"shared", b"initial_value")
-        store.insert(b"key1", b"value1")
-        store.commit("Initial commit")
+    # Create feature branch
+    store.create_branch("feature")
 
-        # Create feature branch
-        store.create_branch("feature")
+    # Make changes on feature branch
+    store.insert(b"feature_key", _FEATURE_VALUE)
+    store.update(_SHARED, _FEATURE_VALUE)
+    store.commit("Feature branch changes")
 
-        # Make changes on feature branch
-        store.insert(b"feature_key", b"feature_value")
-        store.update(b"shared", b"feature_value")
-        store.commit("Feature branch changes")
+    # Switch back to main
+    store.checkout("main")
 
-        # Switch back to main
-        store.checkout("main")
+    # Make different changes on main
+    store.insert(b"main_key", _MAIN_VALUE)
+    store.commit("Main branch changes")
 
-        # Make different changes on main
-        store.insert(b"main_key", b"main_value")
-        store.commit("Main branch changes")
+    # Merge feature into main
+    merge_commit = store.merge("feature")
+    assert merge_commit is not None
 
-        # Merge feature into main
-        merge_commit = store.merge("feature")
-        assert merge_commit is not None
+    # Verify merged state
+    assert store.get(_SHARED) == _FEATURE_VALUE  # Feature change applied
+    assert store.get(b"feature_key") == _FEATURE_VALUE  # Feature addition applied
+    assert store.get(b"main_key") == _MAIN_VALUE  # Main addition preserved
+    assert store.get(b"key1") == b"value1"  # Unchanged key preserved
 
-        # Verify merged state
-        assert store.get(b"shared") == b"feature_value"  # Feature change applied
-        assert store.get(b"feature_key") == b"feature_value"  # Feature addition applied
-        assert store.get(b"main_key") == b"main_value"  # Main addition preserved
-        assert store.get(b"key1") == b"value1"  # Unchanged key preserved
 
-
-def test_merge_with_conflicts_ignore_all():
+def test_merge_with_conflicts_ignore_all(data_dir):
     """Test merging with conflicts using IgnoreAll resolution"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        data_dir = setup_git_repo(tmpdir)
-        store = VersionedKvStore(data_dir)
+    store = VersionedKvStore(data_dir)
 
-        # Add initial data
-        store.insert(b"conflict_key", b"initial_value")
-        store.commit("Initial commit")
+    # Add initial data
+    store.insert(_CONFLICT_KEY, _INITIAL_VALUE)
+    store.commit("Initial commit")
 
-        # Create feature branch
-        store.create_branch("feature")
+    # Create feature branch
+    store.create_branch("feature")
 
-        # Change on feature branch
-        store.update(b"conflict_key", b"feature_value")
-        store.commit("Feature change")
+    # Change on feature branch
+    store.update(_CONFLICT_KEY, _FEATURE_VALUE)
+    store.commit("Feature change")
 
-        # Switch back to main
-        store.checkout("main")
+    # Switch back to main
+    store.checkout("main")
 
-        # Different change on main
-        store.update(b"conflict_key", b"main_value")
-        store.commit("Main change")
+    # Different change on main
+    store.update(_CONFLICT_KEY, _MAIN_VALUE)
+    store.commit("Main change")
 
-        # Merge with IgnoreAll (default) - should keep destination (main) value
-        merge_commit = store.merge("feature", ConflictResolution.IgnoreAll)
-        assert merge_commit is not None
+    # Merge with IgnoreAll (default) - should keep destination (main) value
+    merge_commit = store.merge("feature", ConflictResolution.IgnoreAll)
+    assert merge_commit is not None
 
-        # Should keep main value due to IgnoreAll
-        assert store.get(b"conflict_key") == b"main_value"
+    # Should keep main value due to IgnoreAll
+    assert store.get(_CONFLICT_KEY) == _MAIN_VALUE
 
 
-def test_merge_with_conflicts_take_source():
+def test_merge_with_conflicts_take_source(data_dir):
     """Test merging with conflicts using TakeSource resolution"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        data_dir = setup_git_repo(tmpdir)
-        store = VersionedKvStore(data_dir)
+    store = VersionedKvStore(data_dir)
 
-        # Add initial data
-        store.insert(b"conflict_key", b"initial_value")
-        store.commit("Initial commit")
+    # Add initial data
+    store.insert(_CONFLICT_KEY, _INITIAL_VALUE)
+    store.commit("Initial commit")
 
-        # Create feature branch
-        store.create_branch("feature")
+    # Create feature branch
+    store.create_branch("feature")
 
-        # Change on feature branch
-        store.update(b"conflict_key", b"feature_value")
-        store.commit("Feature change")
+    # Change on feature branch
+    store.update(_CONFLICT_KEY, _FEATURE_VALUE)
+    store.commit("Feature change")
 
-        # Switch back to main
-        store.checkout("main")
+    # Switch back to main
+    store.checkout("main")
 
-        # Different change on main
-        store.update(b"conflict_key", b"main_value")
-        store.commit("Main change")
+    # Different change on main
+    store.update(_CONFLICT_KEY, _MAIN_VALUE)
+    store.commit("Main change")
 
-        # Merge with TakeSource - should take feature value
-        merge_commit = store.merge("feature", ConflictResolution.TakeSource)
-        assert merge_commit is not None
+    # Merge with TakeSource - should take feature value
+    merge_commit = store.merge("feature", ConflictResolution.TakeSource)
+    assert merge_commit is not None
 
-        # Should take feature value
-        assert store.get(b"conflict_key") == b"feature_value"
+    # Should take feature value
+    assert store.get(_CONFLICT_KEY) == _FEATURE_VALUE
 
 
-def test_try_merge_basic():
+def test_try_merge_basic(data_dir):
     """Test try_merge functionality"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        data_dir = setup_git_repo(tmpdir)
-        store = VersionedKvStore(data_dir)
-
-        # Add initial data
-        store.insert(b"conflict_key", b"initial_value")
-        store.commit("Initial commit")
+    store = VersionedKvStore(data_dir)
 
-        # Create feature branch
-        store.create_branch("feature")
+    # Add initial data
+    store.insert(_CONFLICT_KEY, _INITIAL_VALUE)
+    store.commit("Initial commit")
 
-        # Change on feature branch
-        store.update(b"conflict_key", b"feature_value")
-        store.commit("Feature change")
+    # Create feature branch
+    store.create_branch("feature")
 
-        # Switch back to main
-        store.checkout("main")
+    # Change on feature branch
+    store.update(_CONFLICT_KEY, _FEATURE_VALUE)
+    store.commit("Feature change")
 
-        # Different change on main
-        store.update(b"conflict_key", b"main_value")
-        store.commit("Main change")
+    # Switch back to main
+    store.checkout("main")
 
-        # Try merge to detect conflicts
-        success, conflicts = store.try_merge("feature")
+    # Different change on main
+    store.update(_CONFLICT_KEY, _MAIN_VALUE)
+    store.commit("Main change")
 
-        # Should have conflicts
-        assert success is False
-        assert len(conflicts) > 0
+    # Try merge to detect conflicts
+    success, conflicts = store.try_merge("feature")
 
-        # State should be unchanged
-        assert store.get(b"conflict_key") == b"main_value"
+    # Should have conflicts
+    assert success is False
+    assert len(conflicts) > 0
 
+    # State should be unchanged
+    assert store.get(_CONFLICT_KEY) == _MAIN_VALUE
 
-if __name__ == "__main__":
-    try:
-        test_merge_no_conflicts()
-        print("✅ test_merge_no_conflicts passed")
-
-        test_merge_with_conflicts_ignore_all()
-        print("✅ test_merge_with_conflicts_ignore_all passed")
 
-        test_merge_with_conflicts_take_source()
-        print("✅ test_merge_with_conflicts_take_source passed")
+def test_conflict_resolution_variants_are_singletons():
+    """Enum variants are shared class attributes, not rebuilt on each access"""
+    assert ConflictResolution.IgnoreAll is ConflictResolution.IgnoreAll
+    assert ConflictResolution.TakeSource is ConflictResolution.TakeSource
+    assert ConflictResolution.TakeDestination is ConflictResolution.TakeDestination
+    assert ConflictResolution.IgnoreAll != ConflictResolution.TakeSource
 
-        test_try_merge_basic()
-        print("✅ test_try_merge_basic passed")
 
-        print("\n🎉 All merge tests passed!")
-
-    except Exception as e:
-        print(f"❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -21,8 +21,6 @@ default test suite.
 """
 
 import os
-import subprocess
-import tempfile
 
 import pytest
 
@@ -39,14 +37,12 @@ if HashEmbedder is None:
 NamespacedKvStore = prollytree.NamespacedKvStore
 
 
-def _make_dataset(tmpdir):
-    """Initialise a git repo + dataset subdirectory the way CLAUDE.md requires."""
-    subprocess.run(["git", "init"], cwd=tmpdir, check=True, capture_output=True)
-    subprocess.run(["git", "config", "user.name", "Test User"], cwd=tmpdir, check=True)
-    subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=tmpdir, check=True)
-    dataset = os.path.join(tmpdir, "dataset")
-    os.makedirs(dataset)
-    return dataset
+@pytest.fixture
+def dataset(main_repo):
+    """Dataset subdirectory of a private git repository, the way CLAUDE.md requires."""
+    path = os.path.join(main_repo, "dataset")
+    os.makedirs(path)
+    return path
 
 
 def test_hash_embedder_basics():
@@ -90,7 +86,7 @@ def test_callable_embedder_rejects_wrong_dim():
     assert "wrong dim" in str(excinfo.value)
 
 
-def test_callable_embedder_end_to_end_in_text_index():
+def test_callable_embedder_end_to_end_in_text_index(dataset):
     """A user-supplied callable embedder works inside a text index."""
     table = {
         "alpha document one": [1.0, 0.0, 0.0, 0.0],
@@ -102,119 +98,107 @@ def test_callable_embedder_end_to_end_in_text_index():
     def embed(text):
         return table.get(text, [0.25, 0.25, 0.25, 0.25])
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dataset = _make_dataset(tmpdir)
-        store = NamespacedKvStore(dataset)
-        emb = CallableEmbedder(id="user:lookup", version="v1", dim=4, embed_fn=embed)
-        store.text_index_open("personal", "docs", emb)
-        for doc_id, text in zip(
-            [b"alpha", b"beta", b"gamma", b"delta"], list(table.keys())
-        ):
-            store.text_index_insert("personal", "docs", doc_id, text)
+    store = NamespacedKvStore(dataset)
+    emb = CallableEmbedder(id="user:lookup", version="v1", dim=4, embed_fn=embed)
+    store.text_index_open("personal", "docs", emb)
+    for doc_id, text in zip(
+        [b"alpha", b"beta", b"gamma", b"delta"], list(table.keys())
+    ):
+        store.text_index_insert("personal", "docs", doc_id, text)
 
-        # Exact match on `gamma document three` ranks gamma first.
-        hits = store.text_index_search("personal", "docs", "gamma document three", 1)
-        assert len(hits) == 1
-        assert hits[0][0] == b"gamma"
+    # Exact match on `gamma document three` ranks gamma first.
+    hits = store.text_index_search("personal", "docs", "gamma document three", 1)
+    assert len(hits) == 1
+    assert hits[0][0] == b"gamma"
 
 
-def test_text_index_open_insert_search():
+def test_text_index_open_insert_search(dataset):
     """End-to-end: open a text index, insert, search."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dataset = _make_dataset(tmpdir)
-        store = NamespacedKvStore(dataset)
-        embedder = HashEmbedder(32, 0)
-
-        store.text_index_open("personal", "docs", embedder)
-        store.text_index_insert("personal", "docs", b"doc:1", "the quick brown fox")
-        store.text_index_insert("personal", "docs", b"doc:2", "lazy dog asleep on the mat")
-
-        hits = store.text_index_search("personal", "docs", "the quick brown fox", 2)
-        assert len(hits) >= 1
-        # `doc:1` is an exact match and must rank first.
-        assert hits[0][0] == b"doc:1"
-        # Each hit is (id_bytes, score).
-        assert isinstance(hits[0][1], float)
-
-        assert store.text_index_len("personal", "docs") == 2
-        assert store.text_index_chunk_count("personal", "docs") == 2
-
-
-def test_text_index_delete_and_drop():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dataset = _make_dataset(tmpdir)
-        store = NamespacedKvStore(dataset)
-        embedder = HashEmbedder(16, 0)
-        store.text_index_open("personal", "docs", embedder)
-        store.text_index_insert("personal", "docs", b"id-a", "one")
-        store.text_index_insert("personal", "docs", b"id-b", "two")
-
-        assert store.text_index_delete("personal", "docs", b"id-a") is True
-        assert store.text_index_len("personal", "docs") == 1
-
-        # Drop the in-memory cache; subsequent operations should fail with the
-        # "not opened" error.
-        assert store.text_index_drop("personal", "docs") is True
-        with pytest.raises(ValueError):
-            store.text_index_insert("personal", "docs", b"id-c", "three")
-
-
-def test_text_index_line_chunker_multichunk():
+    store = NamespacedKvStore(dataset)
+    embedder = HashEmbedder(32, 0)
+
+    store.text_index_open("personal", "docs", embedder)
+    store.text_index_insert("personal", "docs", b"doc:1", "the quick brown fox")
+    store.text_index_insert("personal", "docs", b"doc:2", "lazy dog asleep on the mat")
+
+    hits = store.text_index_search("personal", "docs", "the quick brown fox", 2)
+    assert len(hits) >= 1
+    # `doc:1` is an exact match and must rank first.
+    assert hits[0][0] == b"doc:1"
+    # Each hit is (id_bytes, score).
+    assert isinstance(hits[0][1], float)
+
+    assert store.text_index_len("personal", "docs") == 2
+    assert store.text_index_chunk_count("personal", "docs") == 2
+
+
+def test_text_index_delete_and_drop(dataset):
+    store = NamespacedKvStore(dataset)
+    embedder = HashEmbedder(16, 0)
+    store.text_index_open("personal", "docs", embedder)
+    store.text_index_insert("personal", "docs", b"id-a", "one")
+    store.text_index_insert("personal", "docs", b"id-b", "two")
+
+    assert store.text_index_delete("personal", "docs", b"id-a") is True
+    assert store.text_index_len("personal", "docs") == 1
+
+    # Drop the in-memory cache; subsequent operations should fail with the
+    # "not opened" error.
+    assert store.text_index_drop("personal", "docs") is True
+    with pytest.raises(ValueError):
+        store.text_index_insert("personal", "docs", b"id-c", "three")
+
+
+def test_text_index_line_chunker_multichunk(dataset):
     """LineChunker splits the document into one chunk per non-empty line."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dataset = _make_dataset(tmpdir)
-        store = NamespacedKvStore(dataset)
-        embedder = HashEmbedder(16, 0)
-        store.text_index_open("personal", "lines", embedder, "line")
-        store.text_index_insert(
-            "personal", "lines", b"doc:1", "alpha\nbeta\ngamma"
-        )
-        assert store.text_index_len("personal", "lines") == 1
-        assert store.text_index_chunk_count("personal", "lines") == 3
-
-
-def test_cascade_mirrors_primary_inserts():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dataset = _make_dataset(tmpdir)
-        store = NamespacedKvStore(dataset)
-        embedder = HashEmbedder(16, 0)
-        store.text_index_open("personal", "docs", embedder)
-        store.set_cascade("personal", ["docs"])
-        assert store.cascade_for_namespace("personal") == ["docs"]
-
-        # Primary insert mirrors into the text index.
-        store.ns_insert("personal", b"doc:1", b"the cascading text")
-        store.commit("cascade insert")
-
-        # The cascaded chunk is searchable.
-        hits = store.text_index_search("personal", "docs", "the cascading text", 1)
-        assert len(hits) == 1
-        assert hits[0][0] == b"doc:1"
-
-        # Clearing cascade is observable.
-        store.clear_cascade("personal")
-        assert store.cascade_for_namespace("personal") is None
-
-
-def test_audit_text_index_in_sync():
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dataset = _make_dataset(tmpdir)
-        store = NamespacedKvStore(dataset)
-        embedder = HashEmbedder(16, 0)
-        store.text_index_open("personal", "docs", embedder)
-        store.set_cascade("personal", ["docs"])
-
-        store.ns_insert("personal", b"doc:1", b"first")
-        store.ns_insert("personal", b"doc:2", b"second")
-        store.commit("two docs")
-
-        report = store.audit_text_index("personal", "docs")
-        assert report["is_in_sync"] is True
-        assert report["orphans_in_index"] == []
-        assert report["missing_from_index"] == []
-
-
-def test_externalize_threshold_accessor_round_trip():
+    store = NamespacedKvStore(dataset)
+    embedder = HashEmbedder(16, 0)
+    store.text_index_open("personal", "lines", embedder, "line")
+    store.text_index_insert(
+        "personal", "lines", b"doc:1", "alpha\nbeta\ngamma"
+    )
+    assert store.text_index_len("personal", "lines") == 1
+    assert store.text_index_chunk_count("personal", "lines") == 3
+
+
+def test_cascade_mirrors_primary_inserts(dataset):
+    store = NamespacedKvStore(dataset)
+    embedder = HashEmbedder(16, 0)
+    store.text_index_open("personal", "docs", embedder)
+    store.set_cascade("personal", ["docs"])
+    assert store.cascade_for_namespace("personal") == ["docs"]
+
+    # Primary insert mirrors into the text index.
+    store.ns_insert("personal", b"doc:1", b"the cascading text")
+    store.commit("cascade insert")
+
+    # The cascaded chunk is searchable.
+    hits = store.text_index_search("personal", "docs", "the cascading text", 1)
+    assert len(hits) == 1
+    assert hits[0][0] == b"doc:1"
+
+    # Clearing cascade is observable.
+    store.clear_cascade("personal")
+    assert store.cascade_for_namespace("personal") is None
+
+
+def test_audit_text_index_in_sync(dataset):
+    store = NamespacedKvStore(dataset)
+    embedder = HashEmbedder(16, 0)
+    store.text_index_open("personal", "docs", embedder)
+    store.set_cascade("personal", ["docs"])
+
+    store.ns_insert("personal", b"doc:1", b"first")
+    store.ns_insert("personal", b"doc:2", b"second")
+    store.commit("two docs")
+
+    report = store.audit_text_index("personal", "docs")
+    assert report["is_in_sync"] is True
+    assert report["orphans_in_index"] == []
+    assert report["missing_from_index"] == []
+
+
+def test_externalize_threshold_accessor_round_trip(dataset):
     """The threshold accessor stores and returns the value.
 
     Note: the Python `NamespacedKvStore` wraps the Git-backed namespaced store,
@@ -222,36 +206,30 @@ def test_externalize_threshold_accessor_round_trip():
     actually committing a > threshold value fails with a clear backend error.
     File and RocksDB backends will get their own Python wrappers in a follow-up.
     """
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dataset = _make_dataset(tmpdir)
-        store = NamespacedKvStore(dataset)
-        assert store.externalize_threshold() is None
-        store.set_externalize_threshold(64)
-        assert store.externalize_threshold() == 64
-        store.set_externalize_threshold(None)
-        assert store.externalize_threshold() is None
+    store = NamespacedKvStore(dataset)
+    assert store.externalize_threshold() is None
+    store.set_externalize_threshold(64)
+    assert store.externalize_threshold() == 64
+    store.set_externalize_threshold(None)
+    assert store.externalize_threshold() is None
 
 
-def test_gc_blobs_reports_empty_on_git_backend():
+def test_gc_blobs_reports_empty_on_git_backend(dataset):
     """`gc_blobs()` is callable but a no-op on the Git-backed wrapper.
 
     The Git `NodeStorage` impl returns an empty `list_blobs()`, so GC walks
     the namespace tree, finds nothing referenced, and reports a clean zero.
     """
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dataset = _make_dataset(tmpdir)
-        store = NamespacedKvStore(dataset)
-        report = store.gc_blobs()
-        assert report["total"] == 0
-        assert report["referenced"] == 0
-        assert report["removed"] == 0
-        assert report["errors"] == []
+    store = NamespacedKvStore(dataset)
+    report = store.gc_blobs()
+    assert report["total"] == 0
+    assert report["referenced"] == 0
+    assert report["removed"] == 0
+    assert report["errors"] == []
 
 
-def test_repr_unchanged_back_compat():
+def test_repr_unchanged_back_compat(dataset):
     """The existing __repr__ surface area is untouched by the proximity additions."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dataset = _make_dataset(tmpdir)
-        store = NamespacedKvStore(dataset)
-        text = repr(store)
-        assert text.startswith("NamespacedKvStore(")
+    store = NamespacedKvStore(dataset)
+    text = repr(store)
+    assert text.startswith("NamespacedKvStore(")
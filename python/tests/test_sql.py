@@ -16,138 +16,190 @@
 Tests for ProllyTree SQL functionality
 """
 
+import csv
+import io
+import json
 import pytest
-import tempfile
+import re
+from operator import itemgetter
 import shutil
 import os
 from prollytree import ProllySQLStore
 
 
+def _sql_data_dir(template, repo_dir):
+    """Copy the template repository to ``repo_dir`` and return a data/ directory inside it"""
+    shutil.copytree(template, repo_dir)
+    data_dir = os.path.join(repo_dir, "data")
+    os.makedirs(data_dir)
+    return data_dir
+
+
+@pytest.fixture(scope="session")
+def temp_store(_git_template, scratch_root):
+    """SQL store shared by the whole session; tests isolate themselves by table name
+
+    Like every store in the suite it lives under ``scratch_root``, so on
+    tmpfs when /dev/shm is available and has room.
+    """
+    return ProllySQLStore(_sql_data_dir(_git_template, scratch_root / "sql_repo"))
+
+
+@pytest.fixture
+def table_name(request):
+    """Table name unique to the requesting test"""
+    return "t_" + re.sub(r"\W", "_", request.node.name)
+
+
 class TestProllySQLStore:
     """Test suite for SQL functionality in ProllyTree"""
 
     @pytest.fixture
-    def temp_store(self):
-        """Create a temporary SQL store for testing"""
-        temp_dir = tempfile.mkdtemp()
-        store = ProllySQLStore(temp_dir)
-        yield store
-        shutil.rmtree(temp_dir)
-
-    def test_create_table(self, temp_store):
+    def users_table(self, temp_store, table_name):
+        """Create a users-shaped table holding Alice and Bob; returns its name"""
+        temp_store.create_table(
+            table_name,
+            [("id", "INTEGER"), ("name", "TEXT"), ("email", "TEXT")]
+        )
+        temp_store.insert(table_name, [
+            [1, "Alice", "alice@example.com"],
+            [2, "Bob", "bob@example.com"]
+        ])
+        return table_name
+
+    def test_create_table(self, temp_store, table_name):
         """Test creating a table"""
         result = temp_store.create_table(
-            "users",
+            table_name,
             [("id", "INTEGER"), ("name", "TEXT"), ("email", "TEXT")]
         )
         assert result["type"] == "create"
         assert result["success"] == True
 
-    def test_insert_data(self, temp_store):
+    def test_insert_data(self, temp_store, table_name):
         """Test inserting data into a table"""
         # Create table first
         temp_store.create_table(
-            "users",
+            table_name,
             [("id", "INTEGER"), ("name", "TEXT"), ("email", "TEXT")]
         )
 
         # Insert data
-        result = temp_store.insert("users", [
+        result = temp_store.insert(table_name, [
             [1, "Alice", "alice@example.com"],
             [2, "Bob", "bob@example.com"]
         ])
         assert result["type"] == "insert"
         assert result["count"] == 2
 
-    def test_select_data(self, temp_store):
-        """Test selecting data from a table"""
-        # Setup
-        temp_store.create_table(
-            "users",
-            [("id", "INTEGER"), ("name", "TEXT"), ("email", "TEXT")]
+    def test_executemany_bulk_insert(self, temp_store, table_name):
+        """Test inserting many rows through executemany"""
+        temp_store.execute(f"CREATE TABLE {table_name} (id INTEGER, name TEXT)")
+
+        rows = [[i, f"name-{i}"] for i in range(250)]
+        assert temp_store.executemany(f"INSERT INTO {table_name} VALUES", rows) == len(rows)
+
+        labels, result = temp_store.execute(
+            f"SELECT COUNT(*) AS n FROM {table_name}", format="tuples"
         )
-        temp_store.insert("users", [
-            [1, "Alice", "alice@example.com"],
-            [2, "Bob", "bob@example.com"]
-        ])
+        assert result == [[len(rows)]]
 
+        with pytest.raises(ValueError):
+            temp_store.executemany(f"SELECT * FROM {table_name}", rows)
+
+    def test_select_data(self, temp_store, users_table):
+        """Test selecting data from a table"""
         # Select all
-        result = temp_store.select("users")
-        assert len(result) == 2
-        assert result[0]["name"] == "Alice"
-        assert result[1]["name"] == "Bob"
+        labels, rows = temp_store.select(users_table, format="tuples")
+        name = labels.index("name")
+        assert len(rows) == 2
+        assert rows[0][name] == "Alice"
+        assert rows[1][name] == "Bob"
 
         # Select specific columns
-        result = temp_store.select("users", columns=["name", "email"])
-        assert len(result) == 2
-        assert "id" not in result[0]
-        assert "name" in result[0]
-        assert "email" in result[0]
+        labels, rows = temp_store.select(users_table, columns=["name", "email"], format="tuples")
+        assert len(rows) == 2
+        assert labels == ["name", "email"]
 
         # Select with WHERE clause
-        result = temp_store.select("users", where_clause="id = 1")
-        assert len(result) == 1
-        assert result[0]["name"] == "Alice"
+        labels, rows = temp_store.select(users_table, where_clause="id = 1", format="tuples")
+        assert len(rows) == 1
+        assert rows[0][name] == "Alice"
 
-    def test_execute_raw_sql(self, temp_store):
+    def test_execute_raw_sql(self, temp_store, table_name):
         """Test executing raw SQL queries"""
         # Create table using raw SQL
         result = temp_store.execute(
-            "CREATE TABLE products (id INTEGER, name TEXT, price FLOAT)"
+            f"CREATE TABLE {table_name} (id INTEGER, name TEXT, price FLOAT)"
         )
         assert result["type"] == "create"
 
         # Insert using raw SQL
         result = temp_store.execute(
-            "INSERT INTO products VALUES (1, 'Widget', 9.99), (2, 'Gadget', 19.99)"
+            f"INSERT INTO {table_name} VALUES (1, 'Widget', 9.99), (2, 'Gadget', 19.99)"
         )
         assert result["type"] == "insert"
         assert result["count"] == 2
 
         # Select using raw SQL
-        result = temp_store.execute("SELECT * FROM products WHERE price < 15")
+        result = temp_store.execute(f"SELECT * FROM {table_name} WHERE price < 15")
         assert len(result) == 1
         assert result[0]["name"] == "Widget"
 
-    def test_output_formats(self, temp_store):
+    @pytest.mark.parametrize("fmt", ["dict", "tuples", "json", "csv"])
+    def test_output_formats(self, temp_store, table_name, fmt):
         """Test different output formats"""
         # Setup
-        temp_store.create_table("test", [("id", "INTEGER"), ("value", "TEXT")])
-        temp_store.insert("test", [[1, "one"], [2, "two"]])
+        temp_store.create_table(table_name, [("id", "INTEGER"), ("value", "TEXT")])
+        temp_store.insert(table_name, [[1, "one"], [2, "two"]])
+
+        result = temp_store.execute(f"SELECT * FROM {table_name}", format=fmt)
+
+        if fmt == "dict":
+            assert isinstance(result, list)
+            assert isinstance(result[0], dict)
+        elif fmt == "tuples":
+            labels, rows = result
+            assert labels == ["id", "value"]
+            assert len(rows) == 2
+            assert rows[0] == [1, "one"]
+        elif fmt == "json":
+            assert isinstance(result, str)
+            data = json.loads(result)
+            assert len(data) == 2
+            assert data[0]["id"] == 1
+        else:
+            assert isinstance(result, str)
+            rows = list(csv.reader(io.StringIO(result)))
+            assert rows[0] == ["id", "value"]
+            assert rows[1] == ["1", "one"]
+
+    def test_repeated_query_sees_schema_changes(self, temp_store, table_name):
+        """Test that a repeated query is re-planned after the table is recreated"""
+        query = f"SELECT * FROM {table_name}"
+        temp_store.execute_many([
+            f"CREATE TABLE {table_name} (id INTEGER, name TEXT)",
+            f"INSERT INTO {table_name} VALUES (1, 'first')",
+        ])
+        assert temp_store.execute(query, format="tuples")[0] == ["id", "name"]
+        assert temp_store.execute(query, format="tuples")[0] == ["id", "name"]
 
-        # Test dict format (default)
-        result = temp_store.execute("SELECT * FROM test", format="dict")
-        assert isinstance(result, list)
-        assert isinstance(result[0], dict)
+        temp_store.execute_many([
+            f"DROP TABLE {table_name}",
+            f"CREATE TABLE {table_name} (id INTEGER, name TEXT, score FLOAT)",
+            f"INSERT INTO {table_name} VALUES (1, 'first', 1.5)",
+        ])
+        labels, rows = temp_store.execute(query, format="tuples")
+        assert labels == ["id", "name", "score"]
+        assert rows == [[1, "first", 1.5]]
 
-        # Test tuples format
-        labels, rows = temp_store.execute("SELECT * FROM test", format="tuples")
-        assert labels == ["id", "value"]
-        assert len(rows) == 2
-        assert rows[0] == [1, "one"]
-
-        # Test JSON format
-        result = temp_store.execute("SELECT * FROM test", format="json")
-        assert isinstance(result, str)
-        import json
-        data = json.loads(result)
-        assert len(data) == 2
-        assert data[0]["id"] == 1
-
-        # Test CSV format
-        result = temp_store.execute("SELECT * FROM test", format="csv")
-        assert isinstance(result, str)
-        lines = result.strip().split("\n")
-        assert lines[0] == "id,value"
-        assert lines[1] == "1,\"one\""
-
-    def test_execute_many(self, temp_store):
+    def test_execute_many(self, temp_store, table_name):
         """Test executing multiple queries"""
         queries = [
-            "CREATE TABLE test1 (id INTEGER, name TEXT)",
-            "CREATE TABLE test2 (id INTEGER, value FLOAT)",
-            "INSERT INTO test1 VALUES (1, 'first')",
-            "INSERT INTO test2 VALUES (1, 3.14)"
+            f"CREATE TABLE {table_name}_1 (id INTEGER, name TEXT)",
+            f"CREATE TABLE {table_name}_2 (id INTEGER, value FLOAT)",
+            f"INSERT INTO {table_name}_1 VALUES (1, 'first')",
+            f"INSERT INTO {table_name}_2 VALUES (1, 3.14)"
         ]
 
         results = temp_store.execute_many(queries)
@@ -157,108 +209,102 @@ class TestProllySQLStore:
         assert results[2]["type"] == "insert"
         assert results[3]["type"] == "insert"
 
-    def test_complex_queries(self, temp_store):
+    def test_complex_queries(self, temp_store, table_name):
         """Test more complex SQL operations"""
-        # Create tables
-        temp_store.execute("""
-            CREATE TABLE customers (
+        # Create and populate tables
+        temp_store.execute_many([
+            f"""
+            CREATE TABLE {table_name}_customers (
                 id INTEGER,
                 name TEXT,
                 country TEXT
             )
-        """)
-
-        temp_store.execute("""
-            CREATE TABLE orders (
+            """,
+            f"""
+            CREATE TABLE {table_name}_orders (
                 id INTEGER,
                 customer_id INTEGER,
                 amount FLOAT,
                 date TEXT
             )
-        """)
-
-        # Insert data
-        temp_store.execute("""
-            INSERT INTO customers VALUES
+            """,
+            f"""
+            INSERT INTO {table_name}_customers VALUES
             (1, 'Alice', 'USA'),
             (2, 'Bob', 'UK'),
             (3, 'Charlie', 'USA')
-        """)
-
-        temp_store.execute("""
-            INSERT INTO orders VALUES
+            """,
+            f"""
+            INSERT INTO {table_name}_orders VALUES
             (1, 1, 100.0, '2024-01-01'),
             (2, 1, 200.0, '2024-01-02'),
             (3, 2, 150.0, '2024-01-03')
-        """)
+            """,
+        ])
 
         # Test JOIN
-        result = temp_store.execute("""
+        labels, rows = temp_store.execute(f"""
             SELECT c.name, o.amount
-            FROM customers c
-            JOIN orders o ON c.id = o.customer_id
+            FROM {table_name}_customers c
+            JOIN {table_name}_orders o ON c.id = o.customer_id
             WHERE c.country = 'USA'
-        """)
-        assert len(result) == 2
-        assert all(r["name"] == "Alice" for r in result)
+        """, format="tuples")
+        assert len(rows) == 2
+        assert set(map(itemgetter(labels.index("name")), rows)) == {"Alice"}
 
         # Test aggregation
-        result = temp_store.execute("""
+        labels, rows = temp_store.execute(f"""
             SELECT customer_id, SUM(amount) as total
-            FROM orders
+            FROM {table_name}_orders
             GROUP BY customer_id
-        """)
-        assert len(result) == 2
-        alice_total = next(r for r in result if r["customer_id"] == 1)
-        assert alice_total["total"] == 300.0
+        """, format="tuples")
+        assert len(rows) == 2
+        totals = dict(map(itemgetter(labels.index("customer_id"), labels.index("total")), rows))
+        assert totals[1] == 300.0
 
-    def test_update_and_delete(self, temp_store):
+    def test_update_and_delete(self, temp_store, table_name):
         """Test UPDATE and DELETE operations"""
         # Setup
-        temp_store.create_table("items", [("id", "INTEGER"), ("name", "TEXT"), ("quantity", "INTEGER")])
-        temp_store.insert("items", [
-            [1, "Item1", 10],
-            [2, "Item2", 20],
-            [3, "Item3", 30]
+        temp_store.execute_many([
+            f"CREATE TABLE {table_name} (id INTEGER, name TEXT, quantity INTEGER)",
+            f"INSERT INTO {table_name} VALUES (1, 'Item1', 10), (2, 'Item2', 20), (3, 'Item3', 30)",
         ])
 
         # Test UPDATE
-        result = temp_store.execute("UPDATE items SET quantity = 25 WHERE id = 2")
+        result = temp_store.execute(f"UPDATE {table_name} SET quantity = 25 WHERE id = 2")
         assert result["type"] == "update"
         assert result["count"] == 1
 
         # Verify update
-        result = temp_store.execute("SELECT * FROM items WHERE id = 2")
-        assert result[0]["quantity"] == 25
+        labels, rows = temp_store.execute(f"SELECT * FROM {table_name} WHERE id = 2", format="tuples")
+        quantity = labels.index("quantity")
+        assert rows[0][quantity] == 25
 
         # Test DELETE
-        result = temp_store.execute("DELETE FROM items WHERE quantity < 20")
+        result = temp_store.execute(f"DELETE FROM {table_name} WHERE quantity < 20")
         assert result["type"] == "delete"
         assert result["count"] == 1
 
         # Verify deletion
-        result = temp_store.execute("SELECT * FROM items")
-        assert len(result) == 2
-        assert all(r["quantity"] >= 20 for r in result)
+        labels, rows = temp_store.execute(f"SELECT * FROM {table_name}", format="tuples")
+        assert len(rows) == 2
+        assert all(r[quantity] >= 20 for r in rows)
 
 
 class TestProllySQLStoreStaticMethods:
     """Test static methods of ProllySQLStore"""
 
-    def test_open_existing_store(self):
+    def test_open_existing_store(self, _git_template, scratch_path):
         """Test opening an existing SQL store"""
-        temp_dir = tempfile.mkdtemp()
-        try:
-            # Create and populate a store
-            store1 = ProllySQLStore(temp_dir)
-            store1.create_table("test", [("id", "INTEGER"), ("value", "TEXT")])
-            store1.insert("test", [[1, "test"]])
-            del store1
-
-            # Open the existing store
-            store2 = ProllySQLStore.open(temp_dir)
-            result = store2.execute("SELECT * FROM test")
-            assert len(result) == 1
-            assert result[0]["value"] == "test"
-        finally:
-            shutil.rmtree(temp_dir)
+        # Create and populate a store
+        data_dir = _sql_data_dir(_git_template, scratch_path / "repo")
+        store1 = ProllySQLStore(data_dir)
+        store1.create_table("test", [("id", "INTEGER"), ("value", "TEXT")])
+        store1.insert("test", [[1, "test"]])
+        store1.close()
+
+        # Open the existing store
+        store2 = ProllySQLStore.open(data_dir)
+        result = store2.execute("SELECT * FROM test")
+        assert len(result) == 1
+        assert result[0]["value"] == "test"
@@ -26,407 +26,349 @@ These tests complement the Rust unit tests in src/git/worktree.rs and
 verify that the Python bindings work correctly.
 """
 
-import tempfile
 import os
-import subprocess
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def test_worktree_manager_functionality():
-    """Test basic WorktreeManager operations"""
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        print(f"📁 Test directory: {tmpdir}")
-
-        # Initialize main repository
-        main_path = os.path.join(tmpdir, "main_repo")
-        os.makedirs(main_path)
-
-        # Initialize git repository
-        subprocess.run(["git", "init"], cwd=main_path, check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], cwd=main_path, check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=main_path, check=True, capture_output=True)
-
-        # Create an initial commit
-        test_file = os.path.join(main_path, "README.md")
-        with open(test_file, "w") as f:
-            f.write("# Test Repository\n")
-
-        subprocess.run(["git", "add", "."], cwd=main_path, check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=main_path, check=True, capture_output=True)
-
-        print("✅ Created main repository with initial commit")
-
-        try:
-            # Import worktree classes directly
-            from prollytree.prollytree import WorktreeManager
-            print("✅ Successfully imported WorktreeManager")
-        except ImportError as e:
-            print(f"❌ Failed to import WorktreeManager: {e}")
-            return False
-
-        # Test 1: Create WorktreeManager
-        print("\n🧪 Test 1: Create WorktreeManager")
-        try:
-            manager = WorktreeManager(main_path)
-            print(f"   ✅ Created WorktreeManager")
-
-            # List initial worktrees
-            worktrees = manager.list_worktrees()
-            print(f"   📊 Initial worktrees: {len(worktrees)}")
-            for wt in worktrees:
-                print(f"      • {wt['id']}: branch={wt['branch']}, linked={wt['is_linked']}")
-        except Exception as e:
-            print(f"   ❌ Failed to create WorktreeManager: {e}")
-            return False
-
-        # Test 2: Add worktrees for different "agents"
-        print("\n🧪 Test 2: Add worktrees for agents")
-        agents = ['agent1', 'agent2', 'agent3']
-        agent_worktrees = {}
-
-        for agent in agents:
-            try:
-                worktree_path = os.path.join(tmpdir, f"{agent}_worktree")
-                branch_name = f"{agent}-feature"
-
-                info = manager.add_worktree(worktree_path, branch_name, True)
-                agent_worktrees[agent] = info
-
-                print(f"   ✅ Created worktree for {agent}: {info['id']}")
-                print(f"      Path: {info['path']}")
-                print(f"      Branch: {info['branch']}")
-            except Exception as e:
-                print(f"   ❌ Failed to create worktree for {agent}: {e}")
-                return False
-
-        # Test 3: Verify worktree isolation
-        print("\n🧪 Test 3: Verify worktree isolation")
-        final_worktrees = manager.list_worktrees()
-        print(f"   📊 Total worktrees: {len(final_worktrees)}")
-
-        # Should have main + 3 agent worktrees
-        expected_count = 4
-        if len(final_worktrees) == expected_count:
-            print(f"   ✅ Correct number of worktrees ({expected_count})")
-        else:
-            print(f"   ❌ Expected {expected_count} worktrees, got {len(final_worktrees)}")
-            return False
-
-        # Verify each agent has their own branch
-        agent_branches = set()
-        for wt in final_worktrees:
-            if wt['is_linked']:  # Skip main worktree
-                agent_branches.add(wt['branch'])
-
-        expected_branches = {f"{agent}-feature" for agent in agents}
-        if agent_branches == expected_branches:
-            print(f"   ✅ All agent branches created correctly")
-        else:
-            print(f"   ❌ Branch mismatch. Expected: {expected_branches}, Got: {agent_branches}")
-            return False
-
-        # Test 4: Test locking mechanism
-        print("\n🧪 Test 4: Test worktree locking")
-        test_agent = agents[0]
-        test_worktree_id = agent_worktrees[test_agent]['id']
-
-        try:
-            # Lock the worktree
-            manager.lock_worktree(test_worktree_id, f"{test_agent} is processing critical data")
-            is_locked = manager.is_locked(test_worktree_id)
-
-            if is_locked:
-                print(f"   ✅ Successfully locked {test_agent}'s worktree")
-            else:
-                print(f"   ❌ Failed to lock {test_agent}'s worktree")
-                return False
-
-            # Try to lock again (should fail)
-            try:
-                manager.lock_worktree(test_worktree_id, "Another lock attempt")
-                print(f"   ❌ Should not be able to double-lock worktree")
-                return False
-            except Exception as e:
-                print(f"   ✅ Correctly prevented double-locking: {type(e).__name__}")
-
-            # Unlock
-            manager.unlock_worktree(test_worktree_id)
-            is_locked = manager.is_locked(test_worktree_id)
-
-            if not is_locked:
-                print(f"   ✅ Successfully unlocked {test_agent}'s worktree")
-            else:
-                print(f"   ❌ Failed to unlock {test_agent}'s worktree")
-                return False
-
-        except Exception as e:
-            print(f"   ❌ Locking test failed: {e}")
-            return False
-
-        # Test 5: Cleanup test
-        print("\n🧪 Test 5: Cleanup worktrees")
-        try:
-            for agent in agents:
-                worktree_id = agent_worktrees[agent]['id']
-                manager.remove_worktree(worktree_id)
-                print(f"   ✅ Removed worktree for {agent}")
-
-            final_worktrees = manager.list_worktrees()
-            if len(final_worktrees) == 1:  # Only main should remain
-                print(f"   ✅ All agent worktrees removed, only main remains")
-            else:
-                print(f"   ❌ Expected 1 worktree after cleanup, got {len(final_worktrees)}")
-                return False
-
-        except Exception as e:
-            print(f"   ❌ Cleanup test failed: {e}")
-            return False
-
-        print("\n✅ All worktree tests passed!")
-        print("\n📊 Summary of verified functionality:")
-        print("   • WorktreeManager creation and initialization")
-        print("   • Multiple worktree creation with different branches")
-        print("   • Worktree listing and metadata access")
-        print("   • Locking mechanism to prevent conflicts")
-        print("   • Worktree cleanup and removal")
-        print("   • Branch isolation for concurrent operations")
-
-        return True
-
-def test_worktree_architecture_concepts():
+import pytest
+
+from _narration import log
+
+WorktreeManager = pytest.importorskip("prollytree.prollytree").WorktreeManager
+
+
+@pytest.fixture(scope="session")
+def shared_repo(scratch_root, _git_template):
+    """One copy of the template repository and a WorktreeManager shared by every test"""
+    main_path = str(scratch_root / "shared_main_repo")
+    shutil.copytree(_git_template, main_path)
+    return main_path, WorktreeManager(main_path)
+
+
+def _snapshot_branch_refs(repo_path):
+    """Map each loose branch ref file under ``repo_path`` to its contents"""
+    heads = Path(repo_path, ".git", "refs", "heads")
+    return {path: path.read_text() for path in heads.rglob("*") if path.is_file()}
+
+
+@pytest.fixture(autouse=True)
+def _reset_shared_repo(shared_repo):
+    """Undo a test's changes to the shared repository so test order doesn't matter
+
+    Linked worktrees are removed and the branch refs (new branches created
+    by add_worktree included) are put back exactly as they were.
+    """
+    main_path, manager = shared_repo
+    refs_before = _snapshot_branch_refs(main_path)
+    yield
+    linked = [wt_id for wt_id, _, is_linked in manager.list_worktrees_basic() if is_linked]
+    for worktree_id in linked:
+        if manager.is_locked(worktree_id):
+            manager.unlock_worktree(worktree_id)
+    manager.remove_worktrees(linked)
+
+    for path in _snapshot_branch_refs(main_path).keys() - refs_before.keys():
+        path.unlink()
+    for path, content in refs_before.items():
+        path.write_text(content)
+
+
+@pytest.fixture
+def write_branch_refs(main_repo):
+    """Writer that points branches of the test's own ``main_repo`` at given hashes
+
+    Bound to the function-scoped copy so fake refs never reach the shared
+    repository; they go away with the copy. WorktreeManager only resolves
+    loose refs (and add_worktree has already written one per branch), so
+    these cannot go into packed-refs.
+    """
+    def write(refs):
+        for branch, commit in refs.items():
+            ref_path = Path(main_repo, ".git", "refs", "heads", *branch.split("/"))
+            ref_path.parent.mkdir(parents=True, exist_ok=True)
+            ref_path.write_text(commit)
+
+    return write
+
+
+def _add_agent_worktrees(manager, tmpdir, agents):
+    """Create one ``<agent>-feature`` worktree per agent in a single bulk call"""
+    infos = manager.add_worktrees_bulk([
+        (os.path.join(tmpdir, f"{agent}_worktree"), f"{agent}-feature", True)
+        for agent in agents
+    ])
+    return dict(zip(agents, infos))
+
+
+AGENTS = ['agent1', 'agent2', 'agent3']
+
+
+def test_create_manager(shared_repo):
+    """A fresh manager only knows about the main worktree"""
+    _, manager = shared_repo
+
+    worktrees = manager.list_worktrees()
+    log(f"   📊 Initial worktrees: {len(worktrees)}")
+    for wt in worktrees:
+        log(f"      • {wt['id']}: branch={wt['branch']}, linked={wt['is_linked']}")
+
+    assert len(worktrees) == 1, f"Expected only the main worktree, got {worktrees}"
+    assert not worktrees[0]['is_linked']
+    assert manager.list_worktrees_basic() == [
+        (worktrees[0]['id'], worktrees[0]['branch'], False)
+    ]
+
+
+def test_add_agent_worktrees(shared_repo, scratch_path):
+    """Each agent gets its own linked worktree on its own branch"""
+    _, manager = shared_repo
+
+    agent_worktrees = _add_agent_worktrees(manager, str(scratch_path), AGENTS)
+    for agent, info in agent_worktrees.items():
+        log(f"   ✅ Created worktree for {agent}: {info['id']}")
+        log(f"      Path: {info['path']}")
+        log(f"      Branch: {info['branch']}")
+
+    # The returned infos already describe the new worktrees
+    infos = agent_worktrees.values()
+    assert all(info['is_linked'] for info in infos)
+    assert {info['branch'] for info in infos} == {f"{agent}-feature" for agent in AGENTS}
+
+    # One listing to confirm the manager tracks main + 3 agent worktrees
+    final_worktrees = manager.list_worktrees()
+    log(f"   📊 Total worktrees: {len(final_worktrees)}")
+    assert len(final_worktrees) == len(agent_worktrees) + 1, \
+        f"Expected 4 worktrees, got {len(final_worktrees)}"
+    assert {wt['id'] for wt in final_worktrees if wt['is_linked']} == \
+        {info['id'] for info in infos}
+    assert manager.list_linked_branches() == {f"{agent}-feature" for agent in AGENTS}
+
+
+def test_lock_unlock(shared_repo, scratch_path):
+    """A locked worktree cannot be locked again until it is unlocked"""
+    _, manager = shared_repo
+
+    test_agent = AGENTS[0]
+    worktree_id = _add_agent_worktrees(manager, str(scratch_path), [test_agent])[test_agent]['id']
+
+    with manager.locked_context(worktree_id, f"{test_agent} is processing critical data"):
+        assert manager.is_locked(worktree_id), f"Failed to lock {test_agent}'s worktree"
+
+        with pytest.raises(ValueError):
+            manager.lock_worktree(worktree_id, "Another lock attempt")
+
+    assert not manager.is_locked(worktree_id), f"Failed to unlock {test_agent}'s worktree"
+
+    # The explicit lock/unlock calls behave the same way
+    manager.lock_worktree(worktree_id, "explicit lock")
+    assert manager.is_locked(worktree_id)
+    manager.unlock_worktree(worktree_id)
+    assert not manager.is_locked(worktree_id)
+
+
+def test_cleanup(shared_repo, scratch_path):
+    """Removing every agent worktree leaves only main"""
+    _, manager = shared_repo
+
+    agent_worktrees = _add_agent_worktrees(manager, str(scratch_path), AGENTS)
+    first, *rest = agent_worktrees.values()
+    manager.remove_worktree(first['id'])
+    manager.remove_worktrees([info['id'] for info in rest])
+    log(f"   ✅ Removed worktrees for {', '.join(agent_worktrees)}")
+
+    remaining = manager.worktree_count()
+    assert remaining == 1, f"Expected 1 worktree after cleanup, got {remaining}"
+    assert manager.list_linked_branches() == set()
+
+
+def test_worktree_architecture_concepts(shared_repo, scratch_path):
     """Test architectural concepts that would be used in multi-agent systems"""
 
-    print("\n" + "="*80)
-    print("🏗️  ARCHITECTURAL VERIFICATION: Multi-Agent Worktree Patterns")
-    print("="*80)
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Setup
-        main_path = os.path.join(tmpdir, "multi_agent_repo")
-        os.makedirs(main_path)
-        subprocess.run(["git", "init"], cwd=main_path, check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.name", "Test"], cwd=main_path, check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=main_path, check=True, capture_output=True)
-
-        test_file = os.path.join(main_path, "shared.txt")
-        with open(test_file, "w") as f:
-            f.write("shared_data=initial\n")
-        subprocess.run(["git", "add", "."], cwd=main_path, check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "Initial"], cwd=main_path, check=True, capture_output=True)
-
-        from prollytree.prollytree import WorktreeManager
-        manager = WorktreeManager(main_path)
-
-        # Simulate multi-agent scenario
-        agents = {
-            'billing': {'branch': 'session-001-billing-abc123', 'task': 'Process billing data'},
-            'support': {'branch': 'session-001-support-def456', 'task': 'Handle customer inquiry'},
-            'analysis': {'branch': 'session-001-analysis-ghi789', 'task': 'Analyze customer patterns'}
+    log("\n" + "="*80)
+    log("🏗️  ARCHITECTURAL VERIFICATION: Multi-Agent Worktree Patterns")
+    log("="*80)
+
+    main_path, manager = shared_repo
+    tmpdir = str(scratch_path)
+
+    # Simulate multi-agent scenario
+    agents = {
+        'billing': {'branch': 'session-001-billing-abc123', 'task': 'Process billing data'},
+        'support': {'branch': 'session-001-support-def456', 'task': 'Handle customer inquiry'},
+        'analysis': {'branch': 'session-001-analysis-ghi789', 'task': 'Analyze customer patterns'}
+    }
+
+    log(f"🤖 Simulating {len(agents)} concurrent agents:")
+
+    # Validate the whole batch once, then only issue the creations
+    existing_branches = set(manager.list_branches())
+    plans = {
+        agent_name: (os.path.join(tmpdir, f"agent_{agent_name}_workspace"), config['branch'])
+        for agent_name, config in agents.items()
+    }
+    assert not existing_branches & {branch for _, branch in plans.values()}
+    assert not any(os.path.exists(path) for path, _ in plans.values())
+
+    # Each agent gets their own worktree, created concurrently
+    with ThreadPoolExecutor(max_workers=len(agents)) as pool:
+        infos = {
+            agent_name: pool.submit(manager.add_worktree, path, branch, True)
+            for agent_name, (path, branch) in plans.items()
         }
 
-        print(f"🤖 Simulating {len(agents)} concurrent agents:")
-
-        # Each agent gets their own worktree
-        for agent_name, config in agents.items():
-            worktree_path = os.path.join(tmpdir, f"agent_{agent_name}_workspace")
-            info = manager.add_worktree(worktree_path, config['branch'], True)
-
-            print(f"   • {agent_name}: branch={config['branch'][:20]}... task='{config['task']}'")
-            print(f"     Workspace: {info['path']}")
-            print(f"     Isolated: {info['is_linked']} (separate working directory)")
-
-        # Verify isolation
-        worktrees = manager.list_worktrees()
-        agent_worktrees = [wt for wt in worktrees if wt['is_linked']]
-
-        print(f"\n🔒 Branch Isolation Analysis:")
-        print(f"   • Total worktrees: {len(worktrees)} (1 main + {len(agent_worktrees)} agents)")
-        print(f"   • Each agent has separate:")
-        print(f"     - Working directory (prevents file conflicts)")
-        print(f"     - Git branch (prevents commit conflicts)")
-        print(f"     - HEAD pointer (prevents checkout conflicts)")
-        print(f"   • Shared Git object database (enables data sharing)")
-
-        # Demonstrate the key insight
-        print(f"\n💡 Key Architectural Insight:")
-        print(f"   This solves the race condition problem identified in the original")
-        print(f"   multi-agent implementation where multiple VersionedKvStore instances")
-        print(f"   pointed to the same Git repository and competed for the same HEAD file.")
-        print(f"   ")
-        print(f"   Now each agent has their own worktree with:")
-        print(f"   - Dedicated .git/worktrees/[worktree_id]/ directory")
-        print(f"   - Independent HEAD file")
-        print(f"   - Separate working directory")
-        print(f"   - But shared object database for collaboration")
-
-        return True
-
-def test_worktree_merge_functionality():
+    for agent_name, config in agents.items():
+        info = infos[agent_name].result()
+
+        log(f"   • {agent_name}: branch={config['branch'][:20]}... task='{config['task']}'")
+        log(f"     Workspace: {info['path']}")
+        log(f"     Isolated: {info['is_linked']} (separate working directory)")
+
+    # Verify isolation
+    worktrees = manager.list_worktrees()
+    agent_worktrees = [wt for wt in worktrees if wt['is_linked']]
+    assert manager.worktree_count() == len(agents) + 1
+    assert len(agent_worktrees) == len(agents)
+    assert len({wt['path'] for wt in agent_worktrees}) == len(agents)
+    assert {wt['branch'] for wt in agent_worktrees} == {c['branch'] for c in agents.values()}
+
+    # Each agent has its own working directory and its own HEAD, on its own
+    # branch, all inside the main repository's shared .git
+    for agent_name, config in agents.items():
+        info = infos[agent_name].result()
+        assert info['is_linked']
+        assert os.path.isdir(info['path'])
+        head = Path(main_path, ".git", "worktrees", info['id'], "HEAD")
+        assert head.read_text() == f"ref: refs/heads/{config['branch']}"
+        assert manager.get_branch_commit(config['branch']) == manager.get_branch_commit("main")
+
+    log("\n🔒 Branch Isolation Analysis:")
+    log(f"   • Total worktrees: {len(worktrees)} (1 main + {len(agent_worktrees)} agents)")
+    log("   • Each agent has separate:")
+    log("     - Working directory (prevents file conflicts)")
+    log("     - Git branch (prevents commit conflicts)")
+    log("     - HEAD pointer (prevents checkout conflicts)")
+    log("   • Shared Git object database (enables data sharing)")
+
+    # Demonstrate the key insight
+    log("\n💡 Key Architectural Insight:")
+    log("   This solves the race condition problem identified in the original")
+    log("   multi-agent implementation where multiple VersionedKvStore instances")
+    log("   pointed to the same Git repository and competed for the same HEAD file.")
+    log("   ")
+    log("   Now each agent has their own worktree with:")
+    log("   - Dedicated .git/worktrees/[worktree_id]/ directory")
+    log("   - Independent HEAD file")
+    log("   - Separate working directory")
+    log("   - But shared object database for collaboration")
+
+
+def test_worktree_merge_functionality(main_repo, write_branch_refs, scratch_path):
     """Test merge functionality in worktree system"""
 
-    print("\n" + "="*80)
-    print("🔄 MERGE FUNCTIONALITY: Testing Branch Merging in Worktrees")
-    print("="*80)
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Setup repository
-        main_path = os.path.join(tmpdir, "merge_test_repo")
-        os.makedirs(main_path)
-        subprocess.run(["git", "init"], cwd=main_path, check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.name", "Test"], cwd=main_path, check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=main_path, check=True, capture_output=True)
-
-        # Create initial commit
-        initial_file = os.path.join(main_path, "base.txt")
-        with open(initial_file, "w") as f:
-            f.write("base content\n")
-        subprocess.run(["git", "add", "."], cwd=main_path, check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=main_path, check=True, capture_output=True)
-
-        from prollytree.prollytree import WorktreeManager
-        manager = WorktreeManager(main_path)
-
-        print("🏗️ Test Setup:")
-        print(f"   Repository: {main_path}")
-
-        # Get initial state
-        initial_branches = manager.list_branches()
-        initial_main_commit = manager.get_branch_commit("main")
-        print(f"   Initial branches: {initial_branches}")
-        print(f"   Initial main commit: {initial_main_commit[:8]}")
-
-        # Create worktrees for different "agents"
-        agents = [
-            {"name": "feature-dev", "branch": "feature/new-feature", "task": "Implement new feature"},
-            {"name": "bug-fix", "branch": "bugfix/critical-fix", "task": "Fix critical bug"},
-        ]
-
-        agent_worktrees = {}
-
-        print(f"\n🤖 Creating agent worktrees:")
-        for agent in agents:
-            worktree_path = os.path.join(tmpdir, f"{agent['name']}_workspace")
-            info = manager.add_worktree(worktree_path, agent["branch"], True)
-            agent_worktrees[agent["name"]] = info
-
-            print(f"   • {agent['name']}: branch={agent['branch']}")
-            print(f"     Task: {agent['task']}")
-            print(f"     Workspace: {info['path']}")
-
-        # Simulate work in feature branch
-        print(f"\n🔧 Simulating work in feature branch:")
-        feature_workspace = agent_worktrees["feature-dev"]["path"]
-        feature_file = os.path.join(feature_workspace, "feature.txt")
-        with open(feature_file, "w") as f:
-            f.write("new feature implementation\n")
-
-        # For testing, manually update the branch reference to simulate commits
-        # In real usage, this would happen through VersionedKvStore operations
-        git_dir = os.path.join(main_path, ".git")
-        feature_branch_ref = os.path.join(git_dir, "refs", "heads", agent_worktrees["feature-dev"]["branch"].replace("/", os.sep))
-        os.makedirs(os.path.dirname(feature_branch_ref), exist_ok=True)
-
-        # Create a fake commit hash to simulate feature work
-        fake_feature_commit = "bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb"
-        with open(feature_branch_ref, "w") as f:
-            f.write(fake_feature_commit)
-
-        feature_commit = manager.get_branch_commit(agent_worktrees["feature-dev"]["branch"])
-        print(f"   Feature work completed: {feature_commit[:8]}")
-
-        # Test merge functionality
-        print(f"\n🔄 Testing merge operations:")
-
-        # Test 1: Merge feature to main
-        feature_worktree_id = agent_worktrees["feature-dev"]["id"]
-        try:
-            merge_result = manager.merge_to_main(feature_worktree_id, "Merge feature work to main")
-            print(f"   ✅ Merge to main succeeded: {merge_result}")
-
-            # Verify main was updated
-            updated_main_commit = manager.get_branch_commit("main")
-            print(f"   📊 Main branch updated: {initial_main_commit[:8]} → {updated_main_commit[:8]}")
-
-            if updated_main_commit != initial_main_commit:
-                print(f"   ✅ Main branch successfully updated")
-            else:
-                print(f"   ⚠️ Main branch unchanged (branches were identical)")
-
-        except Exception as e:
-            print(f"   ❌ Merge failed: {e}")
-            return False
-
-        # Test 2: Invalid merge (merge to self)
-        print(f"\n🚫 Testing invalid merge operations:")
-        try:
-            manager.merge_to_main("main", "Invalid merge")
-            print(f"   ❌ Should not be able to merge main to itself")
-            return False
-        except Exception as e:
-            print(f"   ✅ Correctly prevented invalid merge: {type(e).__name__}")
-
-        # Test 3: Branch listing after merge
-        final_branches = manager.list_branches()
-        print(f"\n📊 Final branch state:")
-        for branch in final_branches:
-            commit = manager.get_branch_commit(branch)
-            print(f"   • {branch}: {commit[:8]}")
-
-        # Test 4: Cross-branch merge
-        print(f"\n🔀 Testing cross-branch merge:")
-        try:
-            # Create another fake commit for bug-fix branch
-            bugfix_branch_ref = os.path.join(git_dir, "refs", "heads", agent_worktrees["bug-fix"]["branch"].replace("/", os.sep))
-            os.makedirs(os.path.dirname(bugfix_branch_ref), exist_ok=True)
-            fake_bugfix_commit = "cccccccccccccccccccccccccccccccccccccccc"
-            with open(bugfix_branch_ref, "w") as f:
-                f.write(fake_bugfix_commit)
-
-            bugfix_worktree_id = agent_worktrees["bug-fix"]["id"]
-            cross_merge_result = manager.merge_branch(
-                bugfix_worktree_id,
-                "main",
-                "Merge bug fix to main"
-            )
-            print(f"   ✅ Cross-branch merge succeeded: {cross_merge_result}")
-
-        except Exception as e:
-            print(f"   ❌ Cross-branch merge failed: {e}")
-            return False
-
-        print(f"\n✅ All merge functionality tests passed!")
-        print(f"\n💡 Key Merge Capabilities Verified:")
-        print(f"   • Merge worktree branches to main")
-        print(f"   • Cross-branch merging between arbitrary branches")
-        print(f"   • Prevention of invalid merge operations")
-        print(f"   • Branch commit tracking and verification")
-        print(f"   • Proper error handling for edge cases")
-
-        return True
+    log("\n" + "="*80)
+    log("🔄 MERGE FUNCTIONALITY: Testing Branch Merging in Worktrees")
+    log("="*80)
+
+    # Merging rewrites main, so this test works on its own copy of the repository
+    main_path = main_repo
+    manager = WorktreeManager(main_path)
+    tmpdir = str(scratch_path)
+
+    log("🏗️ Test Setup:")
+    log(f"   Repository: {main_path}")
+
+    # Get initial state
+    initial_branches = manager.list_branches()
+    initial_main_commit = manager.get_branch_commit("main")
+    log(f"   Initial branches: {initial_branches}")
+    log(f"   Initial main commit: {initial_main_commit[:8]}")
+
+    # Create worktrees for different "agents"
+    agents = [
+        {"name": "feature-dev", "branch": "feature/new-feature", "task": "Implement new feature"},
+        {"name": "bug-fix", "branch": "bugfix/critical-fix", "task": "Fix critical bug"},
+    ]
+
+    log("\n🤖 Creating agent worktrees:")
+    agent_worktrees = {
+        agent["name"]: manager.add_worktree(
+            os.path.join(tmpdir, f"{agent['name']}_workspace"), agent["branch"], True)
+        for agent in agents
+    }
+    for agent in agents:
+        info = agent_worktrees[agent["name"]]
+        log(f"   • {agent['name']}: branch={agent['branch']}")
+        log(f"     Task: {agent['task']}")
+        log(f"     Workspace: {info['path']}")
+
+    # Simulate work in feature branch
+    log("\n🔧 Simulating work in feature branch:")
+    feature_workspace = agent_worktrees["feature-dev"]["path"]
+    Path(feature_workspace, "feature.txt").write_text("new feature implementation\n")
+
+    # For testing, manually update the branch references to simulate commits
+    # on both agent branches. In real usage, this would happen through
+    # VersionedKvStore operations
+    write_branch_refs({
+        agent_worktrees["feature-dev"]["branch"]: "b" * 40,
+        agent_worktrees["bug-fix"]["branch"]: "c" * 40,
+    })
+
+    feature_commit = manager.get_branch_commit(agent_worktrees["feature-dev"]["branch"])
+    log(f"   Feature work completed: {feature_commit[:8]}")
+    assert feature_commit == "b" * 40
+
+    # Test merge functionality
+    log("\n🔄 Testing merge operations:")
+
+    # Test 1: Merge feature to main
+    feature_worktree_id = agent_worktrees["feature-dev"]["id"]
+    merge_result = manager.merge_to_main(feature_worktree_id, "Merge feature work to main")
+    log(f"   ✅ Merge to main succeeded: {merge_result}")
+
+    # Verify main was updated
+    updated_main_commit = manager.get_branch_commit("main")
+    log(f"   📊 Main branch updated: {initial_main_commit[:8]} → {updated_main_commit[:8]}")
+    assert updated_main_commit != initial_main_commit
+    assert updated_main_commit == feature_commit
+
+    # Test 2: Invalid merge (merge to self)
+    log("\n🚫 Testing invalid merge operations:")
+    with pytest.raises(ValueError):
+        manager.merge_to_main("main", "Invalid merge")
+
+    # Test 3: Branch listing after merge
+    final_branches = manager.list_branches()
+    log("\n📊 Final branch state:")
+    for branch in final_branches:
+        commit = manager.get_branch_commit(branch)
+        log(f"   • {branch}: {commit[:8]}")
+
+    # Test 4: Cross-branch merge
+    log("\n🔀 Testing cross-branch merge:")
+    bugfix_worktree_id = agent_worktrees["bug-fix"]["id"]
+    cross_merge_result = manager.merge_branch(
+        bugfix_worktree_id,
+        "main",
+        "Merge bug fix to main"
+    )
+    log(f"   ✅ Cross-branch merge succeeded: {cross_merge_result}")
+    assert manager.get_branch_commit("main") == "c" * 40
+
+    # Merging neither removes nor adds worktrees
+    assert manager.worktree_count() == len(agents) + 1
+    assert not any(manager.is_locked(info["id"]) for info in agent_worktrees.values())
+
+    log("\n✅ All merge functionality tests passed!")
+    log("\n💡 Key Merge Capabilities Verified:")
+    log("   • Merge worktree branches to main")
+    log("   • Cross-branch merging between arbitrary branches")
+    log("   • Prevention of invalid merge operations")
+    log("   • Branch commit tracking and verification")
+    log("   • Proper error handling for edge cases")
+
 
 if __name__ == "__main__":
-    print("🚀 Starting ProllyTree Worktree Functionality Tests")
-
-    success = True
-
-    try:
-        success &= test_worktree_manager_functionality()
-        success &= test_worktree_architecture_concepts()
-        success &= test_worktree_merge_functionality()
-    except Exception as e:
-        print(f"❌ Unexpected error during testing: {e}")
-        success = False
-
-    print("\n" + "="*80)
-    if success:
-        print("✅ ALL WORKTREE TESTS PASSED!")
-        print("   The worktree implementation successfully provides:")
-        print("   • Git worktree-like functionality for ProllyTree")
-        print("   • Safe concurrent branch operations")
-        print("   • Foundation for multi-agent context isolation")
-        sys.exit(0)
-    else:
-        print("❌ SOME TESTS FAILED")
-        print("   Check the error messages above for details")
-        sys.exit(1)
+    sys.exit(pytest.main([__file__, "-v"]))
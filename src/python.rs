@@ -20,7 +20,7 @@ limitations under the License.
 use parking_lot::Mutex;
 use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
-use pyo3::types::{PyBytes, PyBytesMethods, PyDict, PyList};
+use pyo3::types::{PyBytes, PyBytesMethods, PyDict, PyList, PyString};
 use pyo3::IntoPyObjectExt;
 use std::collections::HashMap;
 use std::path::PathBuf;
@@ -46,11 +46,38 @@ use crate::git::versioned_store::RocksDBVersionedKvStore;
 #[cfg(feature = "sql")]
 use crate::sql::ProllyStorage;
 #[cfg(feature = "sql")]
-use gluesql_core::{data::Value as SqlValue, executor::Payload, prelude::Glue};
+use gluesql_core::{ast::Statement, data::Value as SqlValue, executor::Payload, prelude::Glue};
+#[cfg(feature = "sql")]
+use lru::LruCache;
+#[cfg(feature = "sql")]
+use std::num::NonZeroUsize;
 
 // Maximum number of keys that can be retrieved in a single operation
 const MAX_KEYS_LIMIT: usize = 1024;
 
+/// Warn on stderr when a listing of `total_keys` keys will be cut to `MAX_KEYS_LIMIT`.
+fn warn_if_over_key_limit(total_keys: usize) {
+    if total_keys > MAX_KEYS_LIMIT {
+        eprintln!(
+            "Warning: Tree contains {} keys, but only returning first {} keys due to limit. \
+            Consider using more specific queries or implementing pagination.",
+            total_keys, MAX_KEYS_LIMIT
+        );
+    }
+}
+
+// Number of distinct SQL strings whose planned statements are kept per SQL store
+#[cfg(feature = "sql")]
+const SQL_STATEMENT_CACHE_SIZE: NonZeroUsize = NonZeroUsize::new(128).unwrap();
+
+// SQL text longer than this (e.g. bulk INSERT literals) is executed without caching its plan
+#[cfg(feature = "sql")]
+const SQL_STATEMENT_CACHE_MAX_QUERY_LEN: usize = 4096;
+
+// Rows per generated INSERT statement in `ProllySQLStore.executemany`
+#[cfg(feature = "sql")]
+const EXECUTEMANY_CHUNK_ROWS: usize = 1000;
+
 #[pyclass(name = "TreeConfig")]
 struct PyTreeConfig {
     base: u64,
@@ -504,6 +531,9 @@ impl PyMergeConflict {
 }
 
 /// Python enum for conflict resolution strategies
+///
+/// PyO3 exposes each variant as a class attribute built once when the type object
+/// is created, so `ConflictResolution.IgnoreAll` always returns the same object.
 #[pyclass(name = "ConflictResolution", eq, eq_int, from_py_object)]
 #[derive(Clone, PartialEq)]
 enum PyConflictResolution {
@@ -564,6 +594,23 @@ impl PyDiffOperation {
     }
 }
 
+// Operation codes used by `VersionedKvStore.diff_arrays`
+const DIFF_OP_ADDED: u8 = 0;
+const DIFF_OP_REMOVED: u8 = 1;
+const DIFF_OP_MODIFIED: u8 = 2;
+
+/// Packed diff buffers returned by `VersionedKvStore.diff_arrays`:
+/// (key_offsets, keys, op_codes, old_offsets, old_values, new_offsets, new_values)
+type DiffColumns = (
+    Py<PyBytes>,
+    Py<PyBytes>,
+    Py<PyBytes>,
+    Py<PyBytes>,
+    Py<PyBytes>,
+    Py<PyBytes>,
+    Py<PyBytes>,
+);
+
 /// Python wrapper for KvDiff
 #[pyclass(name = "KvDiff", from_py_object)]
 #[derive(Clone)]
@@ -593,6 +640,32 @@ impl PyKvDiff {
     }
 }
 
+/// Iterator over staging area entries returned by `VersionedKvStore.status_iter`.
+///
+/// Entries are snapshotted under the store lock; Python tuples are built one at a
+/// time as the iterator advances instead of as a single list up front.
+#[pyclass(name = "StatusIter")]
+struct PyStatusIter {
+    entries: std::vec::IntoIter<(Vec<u8>, String)>,
+}
+
+#[pymethods]
+impl PyStatusIter {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self, py: Python) -> Option<(Py<PyBytes>, String)> {
+        self.entries
+            .next()
+            .map(|(key, status_str)| (PyBytes::new(py, &key).into(), status_str))
+    }
+
+    fn __len__(&self) -> usize {
+        self.entries.len()
+    }
+}
+
 #[pyclass(name = "VersionedKvStore")]
 struct PyVersionedKvStore {
     inner: Arc<Mutex<VersionedKvStoreWrapper>>,
@@ -602,41 +675,44 @@ struct PyVersionedKvStore {
 impl PyVersionedKvStore {
     #[new]
     #[pyo3(signature = (path, storage_backend=None))]
-    fn new(path: String, storage_backend: Option<PyStorageBackend>) -> PyResult<Self> {
+    fn new(py: Python, path: String, storage_backend: Option<PyStorageBackend>) -> PyResult<Self> {
         let backend = storage_backend.unwrap_or(PyStorageBackend::Git);
-        let wrapper = match backend {
-            PyStorageBackend::Git => {
-                let store = GitVersionedKvStore::<32>::init(&path).map_err(|e| {
-                    PyValueError::new_err(format!("Failed to initialize Git store: {}", e))
-                })?;
-                VersionedKvStoreWrapper::Git(store)
-            }
-            PyStorageBackend::File => {
-                let store = FileVersionedKvStore::<32>::init(&path).map_err(|e| {
-                    PyValueError::new_err(format!("Failed to initialize File store: {}", e))
-                })?;
-                VersionedKvStoreWrapper::File(store)
-            }
-            PyStorageBackend::InMemory => {
-                let store = InMemoryVersionedKvStore::<32>::init(&path).map_err(|e| {
-                    PyValueError::new_err(format!("Failed to initialize InMemory store: {}", e))
-                })?;
-                VersionedKvStoreWrapper::InMemory(store)
-            }
-            #[cfg(feature = "rocksdb_storage")]
-            PyStorageBackend::RocksDB => {
-                let store = RocksDBVersionedKvStore::<32>::init(&path).map_err(|e| {
-                    PyValueError::new_err(format!("Failed to initialize RocksDB store: {}", e))
-                })?;
-                VersionedKvStoreWrapper::RocksDB(store)
-            }
-            #[cfg(not(feature = "rocksdb_storage"))]
-            PyStorageBackend::RocksDB => {
-                return Err(PyValueError::new_err(
-                    "RocksDB storage backend requires 'rocksdb_storage' feature to be enabled",
-                ));
-            }
-        };
+        // Initializing a store does repository IO; let other threads run meanwhile
+        let wrapper = py.detach(|| -> PyResult<VersionedKvStoreWrapper> {
+            Ok(match backend {
+                PyStorageBackend::Git => {
+                    let store = GitVersionedKvStore::<32>::init(&path).map_err(|e| {
+                        PyValueError::new_err(format!("Failed to initialize Git store: {}", e))
+                    })?;
+                    VersionedKvStoreWrapper::Git(store)
+                }
+                PyStorageBackend::File => {
+                    let store = FileVersionedKvStore::<32>::init(&path).map_err(|e| {
+                        PyValueError::new_err(format!("Failed to initialize File store: {}", e))
+                    })?;
+                    VersionedKvStoreWrapper::File(store)
+                }
+                PyStorageBackend::InMemory => {
+                    let store = InMemoryVersionedKvStore::<32>::init(&path).map_err(|e| {
+                        PyValueError::new_err(format!("Failed to initialize InMemory store: {}", e))
+                    })?;
+                    VersionedKvStoreWrapper::InMemory(store)
+                }
+                #[cfg(feature = "rocksdb_storage")]
+                PyStorageBackend::RocksDB => {
+                    let store = RocksDBVersionedKvStore::<32>::init(&path).map_err(|e| {
+                        PyValueError::new_err(format!("Failed to initialize RocksDB store: {}", e))
+                    })?;
+                    VersionedKvStoreWrapper::RocksDB(store)
+                }
+                #[cfg(not(feature = "rocksdb_storage"))]
+                PyStorageBackend::RocksDB => {
+                    return Err(PyValueError::new_err(
+                        "RocksDB storage backend requires 'rocksdb_storage' feature to be enabled",
+                    ));
+                }
+            })
+        })?;
 
         Ok(PyVersionedKvStore {
             inner: Arc::new(Mutex::new(wrapper)),
@@ -699,6 +775,36 @@ impl PyVersionedKvStore {
         })
     }
 
+    /// Stage several key-value pairs with a single lock acquisition and GIL release.
+    fn insert_many(&self, py: Python, pairs: Vec<(Vec<u8>, Vec<u8>)>) -> PyResult<()> {
+        py.detach(|| {
+            let mut guard = self.inner.lock();
+            with_versioned_store_mut!(guard, store, {
+                for (key, value) in pairs {
+                    store
+                        .insert(key, value)
+                        .map_err(|e| PyValueError::new_err(format!("Failed to insert: {}", e)))?;
+                }
+                Ok(())
+            })
+        })
+    }
+
+    /// Look up several keys with a single lock acquisition; missing keys give None.
+    fn get_many(&self, py: Python, keys: Vec<Vec<u8>>) -> PyResult<Vec<Option<Py<PyBytes>>>> {
+        let values: Vec<Option<Vec<u8>>> = py.detach(|| {
+            let guard = self.inner.lock();
+            with_versioned_store!(guard, store, {
+                keys.iter().map(|key| store.get(key)).collect()
+            })
+        });
+
+        Ok(values
+            .into_iter()
+            .map(|value| value.map(|v| PyBytes::new(py, &v).unbind()))
+            .collect())
+    }
+
     fn get(&self, py: Python, key: &Bound<'_, PyBytes>) -> PyResult<Option<Py<PyBytes>>> {
         let key_vec = key.as_bytes().to_vec();
 
@@ -739,14 +845,7 @@ impl PyVersionedKvStore {
         with_versioned_store!(guard, store, {
             let keys = store.list_keys();
 
-            let total_keys = keys.len();
-            if total_keys > MAX_KEYS_LIMIT {
-                eprintln!(
-                    "Warning: Tree contains {} keys, but only returning first {} keys due to limit. \
-                    Consider using more specific queries or implementing pagination.",
-                    total_keys, MAX_KEYS_LIMIT
-                );
-            }
+            warn_if_over_key_limit(keys.len());
 
             let py_keys: Vec<Py<PyBytes>> = keys
                 .iter()
@@ -758,6 +857,27 @@ impl PyVersionedKvStore {
         })
     }
 
+    /// Same as `list_keys`, but decodes each key as UTF-8 and returns `str` objects.
+    fn list_keys_utf8(&self, py: Python) -> PyResult<Vec<Py<PyString>>> {
+        let guard = self.inner.lock();
+        with_versioned_store!(guard, store, {
+            let keys = store.list_keys();
+
+            warn_if_over_key_limit(keys.len());
+
+            keys.iter()
+                .take(MAX_KEYS_LIMIT)
+                .map(|key| {
+                    std::str::from_utf8(key)
+                        .map(|key| PyString::new(py, key).unbind())
+                        .map_err(|e| {
+                            PyValueError::new_err(format!("Key is not valid UTF-8: {}", e))
+                        })
+                })
+                .collect()
+        })
+    }
+
     fn status(&self, py: Python) -> PyResult<Vec<(Py<PyBytes>, String)>> {
         let guard = self.inner.lock();
         with_versioned_store!(guard, store, {
@@ -772,6 +892,33 @@ impl PyVersionedKvStore {
         })
     }
 
+    /// Same as `status`, but yields the `(key, status)` pairs lazily.
+    fn status_iter(&self) -> PyStatusIter {
+        let guard = self.inner.lock();
+        let entries = with_versioned_store!(guard, store, { store.status() });
+        PyStatusIter {
+            entries: entries.into_iter(),
+        }
+    }
+
+    /// Same as `status`, but decodes each key as UTF-8 and returns `str` objects.
+    fn status_utf8(&self, py: Python) -> PyResult<Vec<(Py<PyString>, String)>> {
+        let guard = self.inner.lock();
+        with_versioned_store!(guard, store, {
+            store
+                .status()
+                .into_iter()
+                .map(|(key, status_str)| {
+                    std::str::from_utf8(&key)
+                        .map(|key| (PyString::new(py, key).unbind(), status_str))
+                        .map_err(|e| {
+                            PyValueError::new_err(format!("Key is not valid UTF-8: {}", e))
+                        })
+                })
+                .collect()
+        })
+    }
+
     fn commit(&self, message: String) -> PyResult<String> {
         let mut guard = self.inner.lock();
         with_versioned_store_mut!(guard, store, {
@@ -923,6 +1070,23 @@ impl PyVersionedKvStore {
         })
     }
 
+    /// Ids of the commits that changed `key`, newest first.
+    ///
+    /// Same walk as `get_commits_for_key`, without building a metadata dict per commit.
+    fn get_commit_ids_for_key(&self, key: &Bound<'_, PyBytes>) -> PyResult<Vec<String>> {
+        let key_vec = key.as_bytes().to_vec();
+        let guard = self.inner.lock();
+        with_versioned_store!(guard, store, {
+            let commits = store.get_commits_for_key(&key_vec).map_err(|e| {
+                PyValueError::new_err(format!("Failed to get commits for key: {}", e))
+            })?;
+            Ok(commits
+                .iter()
+                .map(|commit| commit.id.to_hex().to_string())
+                .collect())
+        })
+    }
+
     fn get_commit_history(&self) -> PyResult<Vec<HashMap<String, Py<PyAny>>>> {
         // Collect commit data under lock, then release before Python GIL operations
         // to avoid potential deadlock between mutex and GIL
@@ -1109,14 +1273,7 @@ impl PyVersionedKvStore {
             let keys_map = HistoricalAccess::get_keys_at_ref(store, &reference)
                 .map_err(|e| PyValueError::new_err(format!("Failed to get keys at ref: {}", e)))?;
 
-            let total_keys = keys_map.len();
-            if total_keys > MAX_KEYS_LIMIT {
-                eprintln!(
-                    "Warning: Tree contains {} keys, but only returning first {} keys due to limit. \
-                    Consider using more specific queries or implementing pagination.",
-                    total_keys, MAX_KEYS_LIMIT
-                );
-            }
+            warn_if_over_key_limit(keys_map.len());
 
             let py_pairs: Vec<(Py<PyBytes>, Py<PyBytes>)> = keys_map
                 .into_iter()
@@ -1186,6 +1343,73 @@ impl PyVersionedKvStore {
         })
     }
 
+    /// Compare two commits or branches and return the differences as packed columns
+    ///
+    /// Unlike `diff`, which builds one `KvDiff` object per changed key, this returns
+    /// a fixed number of flat buffers regardless of the diff size. Offset buffers are
+    /// native-endian `u64` arrays with `len + 1` entries; entry `i` spans
+    /// `blob[offsets[i]:offsets[i + 1]]`.
+    ///
+    /// Args:
+    ///     from_ref: Reference (branch or commit) to compare from
+    ///     to_ref: Reference (branch or commit) to compare to
+    ///
+    /// Returns:
+    ///     tuple: (key_offsets, keys, op_codes, old_offsets, old_values, new_offsets, new_values)
+    ///            op_codes holds one byte per entry: 0 = Added, 1 = Removed, 2 = Modified.
+    ///            Added entries have an empty old value, Removed entries an empty new value.
+    fn diff_arrays(&self, py: Python, from_ref: String, to_ref: String) -> PyResult<DiffColumns> {
+        let diffs = {
+            let guard = self.inner.lock();
+            with_versioned_store!(guard, store, {
+                store
+                    .diff(&from_ref, &to_ref)
+                    .map_err(|e| PyValueError::new_err(format!("Failed to compute diff: {}", e)))
+            })?
+        };
+
+        let offsets_len = (diffs.len() + 1) * std::mem::size_of::<u64>();
+        let mut key_offsets = Vec::with_capacity(offsets_len);
+        let mut old_offsets = Vec::with_capacity(offsets_len);
+        let mut new_offsets = Vec::with_capacity(offsets_len);
+        let mut keys = Vec::new();
+        let mut old_values = Vec::new();
+        let mut new_values = Vec::new();
+        let mut op_codes = Vec::with_capacity(diffs.len());
+
+        for offsets in [&mut key_offsets, &mut old_offsets, &mut new_offsets] {
+            offsets.extend_from_slice(&0u64.to_ne_bytes());
+        }
+
+        for diff in &diffs {
+            let (op_code, old, new): (u8, &[u8], &[u8]) = match &diff.operation {
+                DiffOperation::Added(value) => (DIFF_OP_ADDED, &[], value.as_slice()),
+                DiffOperation::Removed(value) => (DIFF_OP_REMOVED, value.as_slice(), &[]),
+                DiffOperation::Modified { old, new } => {
+                    (DIFF_OP_MODIFIED, old.as_slice(), new.as_slice())
+                }
+            };
+
+            op_codes.push(op_code);
+            keys.extend_from_slice(&diff.key);
+            key_offsets.extend_from_slice(&(keys.len() as u64).to_ne_bytes());
+            old_values.extend_from_slice(old);
+            old_offsets.extend_from_slice(&(old_values.len() as u64).to_ne_bytes());
+            new_values.extend_from_slice(new);
+            new_offsets.extend_from_slice(&(new_values.len() as u64).to_ne_bytes());
+        }
+
+        Ok((
+            PyBytes::new(py, &key_offsets).into(),
+            PyBytes::new(py, &keys).into(),
+            PyBytes::new(py, &op_codes).into(),
+            PyBytes::new(py, &old_offsets).into(),
+            PyBytes::new(py, &old_values).into(),
+            PyBytes::new(py, &new_offsets).into(),
+            PyBytes::new(py, &new_values).into(),
+        ))
+    }
+
     /// Get the current commit's object ID
     ///
     /// Returns:
@@ -1203,6 +1427,29 @@ impl PyVersionedKvStore {
     }
 }
 
+/// Python dict view of a worktree, as returned by the WorktreeManager methods
+#[cfg(feature = "git")]
+fn worktree_info_to_py(
+    py: Python,
+    info: &crate::git::worktree::WorktreeInfo,
+) -> HashMap<String, Py<PyAny>> {
+    let mut map = HashMap::new();
+    map.insert("id".to_string(), info.id.as_str().into_py_any(py).unwrap());
+    map.insert(
+        "path".to_string(),
+        info.path.to_string_lossy().into_py_any(py).unwrap(),
+    );
+    map.insert(
+        "branch".to_string(),
+        info.branch.as_str().into_py_any(py).unwrap(),
+    );
+    map.insert(
+        "is_linked".to_string(),
+        info.is_linked.into_py_any(py).unwrap(),
+    );
+    map
+}
+
 #[cfg(feature = "git")]
 #[pyclass(name = "WorktreeManager")]
 struct PyWorktreeManager {
@@ -1212,50 +1459,90 @@ struct PyWorktreeManager {
 #[cfg(feature = "git")]
 #[pymethods]
 impl PyWorktreeManager {
+    /// Open the worktree registry of the repository at `repo_path`
+    ///
+    /// Existing worktrees are discovered from disk with the GIL released,
+    /// so the manager can be opened while other threads build stores.
     #[new]
-    fn new(repo_path: String) -> PyResult<Self> {
-        let manager = crate::git::worktree::WorktreeManager::new(repo_path).map_err(|e| {
-            PyValueError::new_err(format!("Failed to create worktree manager: {}", e))
-        })?;
+    fn new(py: Python, repo_path: String) -> PyResult<Self> {
+        let manager = py
+            .detach(|| crate::git::worktree::WorktreeManager::new(repo_path))
+            .map_err(|e| {
+                PyValueError::new_err(format!("Failed to create worktree manager: {}", e))
+            })?;
 
         Ok(PyWorktreeManager {
             inner: Arc::new(Mutex::new(manager)),
         })
     }
 
+    /// Create a linked worktree at `path` checked out to `branch`
+    ///
+    /// The GIL is released while the worktree is written to disk, so
+    /// worktrees can be created from several Python threads.
     fn add_worktree(
         &self,
+        py: Python,
         path: String,
         branch: String,
         create_branch: bool,
     ) -> PyResult<HashMap<String, Py<PyAny>>> {
-        let mut manager = self.inner.lock();
-        let info = manager
-            .add_worktree(path, &branch, create_branch)
+        let info = py
+            .detach(|| {
+                let mut manager = self.inner.lock();
+                manager.add_worktree(path, &branch, create_branch)
+            })
             .map_err(|e| PyValueError::new_err(format!("Failed to add worktree: {}", e)))?;
 
-        Python::attach(|py| {
-            let mut map = HashMap::new();
-            map.insert("id".to_string(), info.id.into_py_any(py).unwrap());
-            map.insert(
-                "path".to_string(),
-                info.path.to_string_lossy().into_py_any(py).unwrap(),
-            );
-            map.insert("branch".to_string(), info.branch.into_py_any(py).unwrap());
-            map.insert(
-                "is_linked".to_string(),
-                info.is_linked.into_py_any(py).unwrap(),
-            );
-            Ok(map)
+        Ok(worktree_info_to_py(py, &info))
+    }
+
+    /// Create several worktrees from `(path, branch, create_branch)` specs
+    ///
+    /// Takes the manager lock and releases the GIL once for the whole batch.
+    /// Stops at the first failure; worktrees created before it are kept.
+    fn add_worktrees_bulk(
+        &self,
+        py: Python,
+        specs: Vec<(String, String, bool)>,
+    ) -> PyResult<Vec<HashMap<String, Py<PyAny>>>> {
+        let infos = py
+            .detach(|| {
+                let mut manager = self.inner.lock();
+                specs
+                    .into_iter()
+                    .map(|(path, branch, create_branch)| {
+                        manager.add_worktree(path, &branch, create_branch)
+                    })
+                    .collect::<Result<Vec<_>, _>>()
+            })
+            .map_err(|e| PyValueError::new_err(format!("Failed to add worktree: {}", e)))?;
+
+        Ok(infos
+            .iter()
+            .map(|info| worktree_info_to_py(py, info))
+            .collect())
+    }
+
+    fn remove_worktree(&self, py: Python, worktree_id: String) -> PyResult<()> {
+        py.detach(|| {
+            let mut manager = self.inner.lock();
+            manager.remove_worktree(&worktree_id)
         })
+        .map_err(|e| PyValueError::new_err(format!("Failed to remove worktree: {}", e)))
     }
 
-    fn remove_worktree(&self, worktree_id: String) -> PyResult<()> {
-        let mut manager = self.inner.lock();
-        manager
-            .remove_worktree(&worktree_id)
-            .map_err(|e| PyValueError::new_err(format!("Failed to remove worktree: {}", e)))?;
-        Ok(())
+    /// Remove several worktrees under a single lock and GIL release
+    ///
+    /// Stops at the first failure; worktrees before it have been removed.
+    fn remove_worktrees(&self, py: Python, worktree_ids: Vec<String>) -> PyResult<()> {
+        py.detach(|| {
+            let mut manager = self.inner.lock();
+            worktree_ids
+                .iter()
+                .try_for_each(|worktree_id| manager.remove_worktree(worktree_id))
+        })
+        .map_err(|e| PyValueError::new_err(format!("Failed to remove worktree: {}", e)))
     }
 
     fn lock_worktree(&self, worktree_id: String, reason: String) -> PyResult<()> {
@@ -1274,40 +1561,72 @@ impl PyWorktreeManager {
         Ok(())
     }
 
+    /// List all worktrees, including the main one
+    ///
+    /// Served from the manager's in-memory registry, which is kept up to date
+    /// by add/remove; no git state is re-read, so there is nothing to cache
+    /// on the Python side.
     fn list_worktrees(&self) -> PyResult<Vec<HashMap<String, Py<PyAny>>>> {
         let manager = self.inner.lock();
         let worktrees = manager.list_worktrees();
 
         Python::attach(|py| {
-            let results: Vec<HashMap<String, Py<PyAny>>> = worktrees
+            Ok(worktrees
                 .iter()
-                .map(|info| {
-                    let mut map = HashMap::new();
-                    map.insert("id".to_string(), info.id.clone().into_py_any(py).unwrap());
-                    map.insert(
-                        "path".to_string(),
-                        info.path.to_string_lossy().into_py_any(py).unwrap(),
-                    );
-                    map.insert(
-                        "branch".to_string(),
-                        info.branch.clone().into_py_any(py).unwrap(),
-                    );
-                    map.insert(
-                        "is_linked".to_string(),
-                        info.is_linked.into_py_any(py).unwrap(),
-                    );
-                    map
-                })
-                .collect();
-            Ok(results)
+                .map(|info| worktree_info_to_py(py, info))
+                .collect())
         })
     }
 
+    /// List all worktrees as `(id, branch, is_linked)` tuples
+    ///
+    /// Lighter than `list_worktrees` for callers that only need to tell the
+    /// worktrees apart: no per-worktree dict or path string is built.
+    fn list_worktrees_basic(&self) -> Vec<(String, String, bool)> {
+        let manager = self.inner.lock();
+        manager
+            .list_worktrees()
+            .into_iter()
+            .map(|info| (info.id.clone(), info.branch.clone(), info.is_linked))
+            .collect()
+    }
+
+    /// Branches checked out in linked worktrees, as a set
+    fn list_linked_branches(&self) -> std::collections::HashSet<String> {
+        let manager = self.inner.lock();
+        manager
+            .list_worktrees()
+            .into_iter()
+            .filter(|info| info.is_linked)
+            .map(|info| info.branch.clone())
+            .collect()
+    }
+
+    /// Number of worktrees, including the main one
+    fn worktree_count(&self) -> usize {
+        self.inner.lock().list_worktrees().len()
+    }
+
+    /// Check whether a worktree is locked (from the in-memory registry)
     fn is_locked(&self, worktree_id: String) -> PyResult<bool> {
         let manager = self.inner.lock();
         Ok(manager.is_locked(&worktree_id))
     }
 
+    /// Context manager that locks a worktree on entry and unlocks it on exit
+    ///
+    /// ```python
+    /// with manager.locked_context(worktree_id, "processing"):
+    ///     ...
+    /// ```
+    fn locked_context(&self, worktree_id: String, reason: String) -> PyWorktreeLock {
+        PyWorktreeLock {
+            manager: Arc::clone(&self.inner),
+            worktree_id,
+            reason,
+        }
+    }
+
     /// Merge a worktree branch back to main branch
     fn merge_to_main(&self, worktree_id: String, commit_message: String) -> PyResult<String> {
         let mut manager = self.inner.lock();
@@ -1316,6 +1635,28 @@ impl PyWorktreeManager {
             .map_err(|e| PyValueError::new_err(format!("Failed to merge to main: {}", e)))
     }
 
+    /// Merge several worktree branches to main under a single lock and GIL release
+    ///
+    /// Takes `(worktree_id, commit_message)` pairs and returns one result
+    /// message per merge, in order. Stops at the first failure; merges
+    /// before it have been applied.
+    fn merge_branches_to_main(
+        &self,
+        py: Python,
+        merges: Vec<(String, String)>,
+    ) -> PyResult<Vec<String>> {
+        py.detach(|| {
+            let mut manager = self.inner.lock();
+            merges
+                .iter()
+                .map(|(worktree_id, commit_message)| {
+                    manager.merge_to_main(worktree_id, commit_message)
+                })
+                .collect::<Result<Vec<_>, _>>()
+        })
+        .map_err(|e| PyValueError::new_err(format!("Failed to merge to main: {}", e)))
+    }
+
     /// Merge a worktree branch to another target branch
     fn merge_branch(
         &self,
@@ -1346,6 +1687,40 @@ impl PyWorktreeManager {
     }
 }
 
+/// Guard returned by `WorktreeManager.locked_context`
+#[cfg(feature = "git")]
+#[pyclass(name = "WorktreeLock")]
+struct PyWorktreeLock {
+    manager: Arc<Mutex<crate::git::worktree::WorktreeManager>>,
+    worktree_id: String,
+    reason: String,
+}
+
+#[cfg(feature = "git")]
+#[pymethods]
+impl PyWorktreeLock {
+    fn __enter__(slf: PyRef<'_, Self>) -> PyResult<PyRef<'_, Self>> {
+        slf.manager
+            .lock()
+            .lock_worktree(&slf.worktree_id, &slf.reason)
+            .map_err(|e| PyValueError::new_err(format!("Failed to lock worktree: {}", e)))?;
+        Ok(slf)
+    }
+
+    fn __exit__(
+        &self,
+        _exc_type: &Bound<'_, PyAny>,
+        _exc_value: &Bound<'_, PyAny>,
+        _traceback: &Bound<'_, PyAny>,
+    ) -> PyResult<bool> {
+        self.manager
+            .lock()
+            .unlock_worktree(&self.worktree_id)
+            .map_err(|e| PyValueError::new_err(format!("Failed to unlock worktree: {}", e)))?;
+        Ok(false)
+    }
+}
+
 #[cfg(feature = "git")]
 #[pyclass(name = "WorktreeVersionedKvStore")]
 struct PyWorktreeVersionedKvStore {
@@ -1451,14 +1826,7 @@ impl PyWorktreeVersionedKvStore {
         let store = self.inner.lock();
         let keys = store.store().list_keys();
 
-        let total_keys = keys.len();
-        if total_keys > MAX_KEYS_LIMIT {
-            eprintln!(
-                "Warning: Tree contains {} keys, but only returning first {} keys due to limit. \
-                Consider using more specific queries or implementing pagination.",
-                total_keys, MAX_KEYS_LIMIT
-            );
-        }
+        warn_if_over_key_limit(keys.len());
 
         Ok(keys.into_iter().take(MAX_KEYS_LIMIT).collect())
     }
@@ -1495,6 +1863,116 @@ impl PyWorktreeVersionedKvStore {
 #[pyclass(name = "ProllySQLStore")]
 struct PyProllySQLStore {
     inner: Arc<Mutex<Glue<ProllyStorage<32>>>>,
+    /// Handle on the store underneath `inner`, for operations that bypass SQL.
+    store: ThreadSafeGitVersionedKvStore<32>,
+    /// Planned statements keyed by SQL text, so repeated queries skip parsing and planning.
+    statements: Arc<Mutex<StatementCache>>,
+}
+
+/// Planned SQL statements, valid for one generation of the schema.
+///
+/// Plans embed schema lookups. The underlying store is private to this
+/// handle, so the schema only changes through its own commit paths:
+/// `commit`, `close` and any DDL or transaction-control statement. Those
+/// call `invalidate`, which drops every plan and bumps `generation` so a plan
+/// made before the change is not stored after it.
+#[cfg(feature = "sql")]
+struct StatementCache {
+    generation: u64,
+    plans: LruCache<String, Arc<Vec<Statement>>>,
+}
+
+#[cfg(feature = "sql")]
+impl PyProllySQLStore {
+    fn from_store(store: ThreadSafeGitVersionedKvStore<32>) -> Self {
+        let glue = Glue::new(ProllyStorage::<32>::new(store.clone()));
+        PyProllySQLStore {
+            inner: Arc::new(Mutex::new(glue)),
+            store,
+            statements: Arc::new(Mutex::new(StatementCache {
+                generation: 0,
+                plans: LruCache::new(SQL_STATEMENT_CACHE_SIZE),
+            })),
+        }
+    }
+
+    /// Drop every planned statement after the schema may have changed.
+    fn invalidate(&self) {
+        let mut cache = self.statements.lock();
+        cache.plans.clear();
+        cache.generation += 1;
+    }
+
+    /// Execute `query`, reusing its planned statements when the same text was seen before
+    /// since the last schema change.
+    async fn execute_cached(
+        &self,
+        glue: &mut Glue<ProllyStorage<32>>,
+        query: &str,
+    ) -> PyResult<Vec<Payload>> {
+        let (generation, cached) = {
+            let mut cache = self.statements.lock();
+            (cache.generation, cache.plans.get(query).cloned())
+        };
+        let statements = match cached {
+            Some(statements) => statements,
+            None => {
+                let planned = Arc::new(Self::plan(glue, query).await?);
+                let mut cache = self.statements.lock();
+                if cache.generation == generation
+                    && query.len() <= SQL_STATEMENT_CACHE_MAX_QUERY_LEN
+                {
+                    cache.plans.put(query.to_string(), planned.clone());
+                }
+                planned
+            }
+        };
+        self.execute_statements(glue, &statements).await
+    }
+
+    /// Execute `query` without looking up or storing its plan, for one-off statements.
+    async fn execute_uncached(
+        &self,
+        glue: &mut Glue<ProllyStorage<32>>,
+        query: &str,
+    ) -> PyResult<Vec<Payload>> {
+        let statements = Self::plan(glue, query).await?;
+        self.execute_statements(glue, &statements).await
+    }
+
+    async fn plan(glue: &mut Glue<ProllyStorage<32>>, query: &str) -> PyResult<Vec<Statement>> {
+        glue.plan(query)
+            .await
+            .map_err(|e| PyValueError::new_err(format!("SQL execution failed: {}", e)))
+    }
+
+    async fn execute_statements(
+        &self,
+        glue: &mut Glue<ProllyStorage<32>>,
+        statements: &[Statement],
+    ) -> PyResult<Vec<Payload>> {
+        let mut payloads = Vec::with_capacity(statements.len());
+        for statement in statements {
+            let payload = glue
+                .execute_stmt(statement)
+                .await
+                .map_err(|e| PyValueError::new_err(format!("SQL execution failed: {}", e)))?;
+            // Anything besides reads and row writes (DDL, transaction control, ...)
+            // may change the schema, so drop every plan.
+            if !matches!(
+                payload,
+                Payload::Select { .. }
+                    | Payload::SelectMap(_)
+                    | Payload::Insert(_)
+                    | Payload::Update(_)
+                    | Payload::Delete(_)
+            ) {
+                self.invalidate();
+            }
+            payloads.push(payload);
+        }
+        Ok(payloads)
+    }
 }
 
 #[cfg(feature = "sql")]
@@ -1505,12 +1983,7 @@ impl PyProllySQLStore {
         let store = ThreadSafeGitVersionedKvStore::<32>::init(path)
             .map_err(|e| PyValueError::new_err(format!("Failed to initialize store: {}", e)))?;
 
-        let storage = ProllyStorage::<32>::new(store);
-        let glue = Glue::new(storage);
-
-        Ok(PyProllySQLStore {
-            inner: Arc::new(Mutex::new(glue)),
-        })
+        Ok(PyProllySQLStore::from_store(store))
     }
 
     #[staticmethod]
@@ -1518,12 +1991,7 @@ impl PyProllySQLStore {
         let store = ThreadSafeGitVersionedKvStore::<32>::open(path)
             .map_err(|e| PyValueError::new_err(format!("Failed to open store: {}", e)))?;
 
-        let storage = ProllyStorage::<32>::new(store);
-        let glue = Glue::new(storage);
-
-        Ok(PyProllySQLStore {
-            inner: Arc::new(Mutex::new(glue)),
-        })
+        Ok(PyProllySQLStore::from_store(store))
     }
 
     #[pyo3(signature = (query, format="dict"))]
@@ -1535,10 +2003,7 @@ impl PyProllySQLStore {
             let mut glue = self.inner.lock();
 
             runtime.block_on(async {
-                let results = glue
-                    .execute(&query)
-                    .await
-                    .map_err(|e| PyValueError::new_err(format!("SQL execution failed: {}", e)))?;
+                let results = self.execute_cached(&mut glue, &query).await?;
 
                 // GlueSQL returns a Vec<Payload>, we'll handle the first result
                 let result = results
@@ -1701,6 +2166,7 @@ impl PyProllySQLStore {
                 glue.execute("COMMIT")
                     .await
                     .map_err(|e| PyValueError::new_err(format!("Failed to commit: {}", e)))?;
+                self.invalidate();
 
                 // Return a placeholder commit ID for now
                 // In a real implementation, we'd need to expose a way to get the commit ID
@@ -1710,6 +2176,25 @@ impl PyProllySQLStore {
         })
     }
 
+    /// Commit any changes still staged in the underlying store so that another
+    /// handle opened with `ProllySQLStore.open` sees them. The store stays usable.
+    fn close(&self, py: Python) -> PyResult<()> {
+        py.detach(|| {
+            let _glue = self.inner.lock();
+            let staged = self
+                .store
+                .status()
+                .map_err(|e| PyValueError::new_err(format!("Failed to read status: {}", e)))?;
+            if !staged.is_empty() {
+                self.store
+                    .commit("Close SQL store")
+                    .map_err(|e| PyValueError::new_err(format!("Failed to commit: {}", e)))?;
+                self.invalidate();
+            }
+            Ok(())
+        })
+    }
+
     fn create_table(
         &self,
         py: Python,
@@ -1728,35 +2213,16 @@ impl PyProllySQLStore {
         &self,
         py: Python,
         table_name: String,
-        values: Vec<Vec<Py<PyAny>>>,
+        values: Vec<Vec<Bound<'_, PyAny>>>,
     ) -> PyResult<Py<PyAny>> {
         if values.is_empty() {
             return Err(PyValueError::new_err("No values to insert"));
         }
 
-        let mut value_strings = Vec::new();
-        for row in values {
-            let mut row_values = Vec::new();
-            for value in row {
-                let value_str = Python::attach(|py| -> PyResult<String> {
-                    if let Ok(s) = value.extract::<String>(py) {
-                        Ok(format!("'{}'", s.replace('\'', "''")))
-                    } else if let Ok(i) = value.extract::<i64>(py) {
-                        Ok(i.to_string())
-                    } else if let Ok(f) = value.extract::<f64>(py) {
-                        Ok(f.to_string())
-                    } else if let Ok(b) = value.extract::<bool>(py) {
-                        Ok(b.to_string())
-                    } else if value.is_none(py) {
-                        Ok("NULL".to_string())
-                    } else {
-                        Ok(format!("'{}'", value))
-                    }
-                })?;
-                row_values.push(value_str);
-            }
-            value_strings.push(format!("({})", row_values.join(", ")));
-        }
+        let value_strings = values
+            .iter()
+            .map(|row| sql_row_literal(row))
+            .collect::<PyResult<Vec<_>>>()?;
 
         let query = format!(
             "INSERT INTO {} VALUES {}",
@@ -1766,13 +2232,62 @@ impl PyProllySQLStore {
         self.execute(py, query, "dict")
     }
 
-    #[pyo3(signature = (table_name, columns=None, where_clause=None))]
+    /// Run an `INSERT ... VALUES` statement (given without value tuples) for every row in
+    /// `rows`, and return the number of rows inserted.
+    ///
+    /// Rows are converted to SQL literals in one pass and sent in chunks of
+    /// `EXECUTEMANY_CHUNK_ROWS`, all under a single lock and runtime.
+    fn executemany(
+        &self,
+        py: Python,
+        statement: &str,
+        rows: Vec<Vec<Bound<'_, PyAny>>>,
+    ) -> PyResult<usize> {
+        let statement = statement.trim_end();
+        if !statement.to_ascii_uppercase().ends_with("VALUES") {
+            return Err(PyValueError::new_err(
+                "executemany expects an INSERT ... VALUES statement without value tuples",
+            ));
+        }
+
+        let mut queries = Vec::with_capacity(rows.len().div_ceil(EXECUTEMANY_CHUNK_ROWS));
+        for chunk in rows.chunks(EXECUTEMANY_CHUNK_ROWS) {
+            let tuples = chunk
+                .iter()
+                .map(|row| sql_row_literal(row))
+                .collect::<PyResult<Vec<_>>>()?;
+            queries.push(format!("{} {}", statement, tuples.join(", ")));
+        }
+
+        py.detach(|| {
+            let runtime = tokio::runtime::Runtime::new()
+                .map_err(|e| PyValueError::new_err(format!("Failed to create runtime: {}", e)))?;
+
+            let mut glue = self.inner.lock();
+
+            runtime.block_on(async {
+                let mut inserted = 0;
+                for query in &queries {
+                    // Each chunk's literal text is one-off; caching it would only evict useful plans
+                    for payload in self.execute_uncached(&mut glue, query).await? {
+                        if let Payload::Insert(count) = payload {
+                            inserted += count;
+                        }
+                    }
+                }
+                Ok(inserted)
+            })
+        })
+    }
+
+    #[pyo3(signature = (table_name, columns=None, where_clause=None, format="dict"))]
     fn select(
         &self,
         py: Python,
         table_name: String,
         columns: Option<Vec<String>>,
         where_clause: Option<String>,
+        format: &str,
     ) -> PyResult<Py<PyAny>> {
         let columns_str = columns
             .map(|c| c.join(", "))
@@ -1783,10 +2298,35 @@ impl PyProllySQLStore {
             query.push_str(&format!(" WHERE {}", where_str));
         }
 
-        self.execute(py, query, "dict")
+        self.execute(py, query, format)
+    }
+}
+
+/// Render one Python value as a SQL literal.
+#[cfg(feature = "sql")]
+fn sql_literal(value: &Bound<'_, PyAny>) -> PyResult<String> {
+    if let Ok(s) = value.extract::<String>() {
+        Ok(format!("'{}'", s.replace('\'', "''")))
+    } else if let Ok(i) = value.extract::<i64>() {
+        Ok(i.to_string())
+    } else if let Ok(f) = value.extract::<f64>() {
+        Ok(f.to_string())
+    } else if let Ok(b) = value.extract::<bool>() {
+        Ok(b.to_string())
+    } else if value.is_none() {
+        Ok("NULL".to_string())
+    } else {
+        Ok(format!("'{}'", value))
     }
 }
 
+/// Render a row of Python values as a parenthesized SQL value tuple.
+#[cfg(feature = "sql")]
+fn sql_row_literal(row: &[Bound<'_, PyAny>]) -> PyResult<String> {
+    let literals = row.iter().map(sql_literal).collect::<PyResult<Vec<_>>>()?;
+    Ok(format!("({})", literals.join(", ")))
+}
+
 #[cfg(feature = "sql")]
 fn sql_value_to_python(py: Python, value: &SqlValue) -> PyResult<Py<PyAny>> {
     match value {
@@ -2686,12 +3226,15 @@ fn prollytree(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<PyConflictResolution>()?;
     m.add_class::<PyDiffOperation>()?;
     m.add_class::<PyKvDiff>()?;
+    m.add_class::<PyStatusIter>()?;
     m.add_class::<PyVersionedKvStore>()?;
     #[cfg(feature = "git")]
     m.add_class::<PyNamespacedKvStore>()?;
     #[cfg(feature = "git")]
     m.add_class::<PyWorktreeManager>()?;
     #[cfg(feature = "git")]
+    m.add_class::<PyWorktreeLock>()?;
+    #[cfg(feature = "git")]
     m.add_class::<PyWorktreeVersionedKvStore>()?;
     #[cfg(feature = "sql")]
     m.add_class::<PyProllySQLStore>()?;